@@ -0,0 +1,31 @@
+"""partial index for per-hostel live beds
+
+Revision ID: add_beds_hostel_active_idx_001
+Revises: add_hostel_active_idx_001
+Create Date: 2026-10-16 16:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'add_beds_hostel_active_idx_001'
+down_revision = 'add_hostel_active_idx_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Index live (not soft-deleted) beds by hostel."""
+    op.create_index(
+        'idx_beds_hostel_active',
+        'beds',
+        ['hostel_id'],
+        postgresql_where=sa.text('is_deleted = false'),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Drop the partial index."""
+    op.drop_index('idx_beds_hostel_active', table_name='beds', if_exists=True)
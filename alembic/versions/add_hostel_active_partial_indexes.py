@@ -0,0 +1,39 @@
+"""partial indexes for per-hostel live row counts
+
+Revision ID: add_hostel_active_idx_001
+Revises: payment_metadata_jsonb_001
+Create Date: 2026-10-16 13:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'add_hostel_active_idx_001'
+down_revision = 'payment_metadata_jsonb_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Index live (not soft-deleted) rooms and tenants by hostel."""
+    op.create_index(
+        'idx_rooms_hostel_active',
+        'rooms',
+        ['hostel_id'],
+        postgresql_where=sa.text('is_deleted = false'),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'idx_tenant_profiles_hostel_active',
+        'tenant_profiles',
+        ['hostel_id'],
+        postgresql_where=sa.text('is_deleted = false'),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Drop the partial indexes."""
+    op.drop_index('idx_tenant_profiles_hostel_active', table_name='tenant_profiles', if_exists=True)
+    op.drop_index('idx_rooms_hostel_active', table_name='rooms', if_exists=True)
@@ -0,0 +1,25 @@
+"""add invoice number sequence
+
+Revision ID: add_invoice_seq_001
+Revises: e64590d25587
+Create Date: 2026-10-16 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'add_invoice_seq_001'
+down_revision = 'e64590d25587'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the sequence used to allocate invoice numbers."""
+    op.execute("CREATE SEQUENCE IF NOT EXISTS invoice_seq")
+
+
+def downgrade() -> None:
+    """Drop the invoice number sequence."""
+    op.execute("DROP SEQUENCE IF EXISTS invoice_seq")
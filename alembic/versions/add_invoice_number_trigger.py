@@ -0,0 +1,67 @@
+"""generate invoice and receipt numbers in the database
+
+Revision ID: add_invoice_number_trigger_001
+Revises: add_invoice_seq_001
+Create Date: 2026-10-16 11:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'add_invoice_number_trigger_001'
+down_revision = 'add_invoice_seq_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Assign invoice/receipt numbers from sequences via triggers."""
+    op.execute("CREATE SEQUENCE IF NOT EXISTS receipt_seq")
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION set_invoice_number() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.invoice_number IS NULL THEN
+                NEW.invoice_number := 'INV-' || NEW.hostel_id || '-'
+                    || to_char(timezone('UTC', now()), 'YYYYMMDD') || '-'
+                    || lpad(upper(to_hex(nextval('invoice_seq'))), 8, '0');
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER IF EXISTS trg_invoices_number ON invoices")
+    op.execute("""
+        CREATE TRIGGER trg_invoices_number
+            BEFORE INSERT ON invoices
+            FOR EACH ROW EXECUTE FUNCTION set_invoice_number()
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION set_receipt_number() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.status = 'SUCCESS' AND NEW.receipt_number IS NULL THEN
+                NEW.receipt_number := 'RCP-' || NEW.hostel_id || '-'
+                    || to_char(timezone('UTC', now()), 'YYYYMMDD') || '-'
+                    || lpad(upper(to_hex(nextval('receipt_seq'))), 8, '0');
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER IF EXISTS trg_payments_receipt_number ON payments")
+    op.execute("""
+        CREATE TRIGGER trg_payments_receipt_number
+            BEFORE INSERT OR UPDATE OF status ON payments
+            FOR EACH ROW EXECUTE FUNCTION set_receipt_number()
+    """)
+
+
+def downgrade() -> None:
+    """Drop the number triggers; numbers must be supplied by the application again."""
+    op.execute("DROP TRIGGER IF EXISTS trg_payments_receipt_number ON payments")
+    op.execute("DROP FUNCTION IF EXISTS set_receipt_number()")
+    op.execute("DROP TRIGGER IF EXISTS trg_invoices_number ON invoices")
+    op.execute("DROP FUNCTION IF EXISTS set_invoice_number()")
+    op.execute("DROP SEQUENCE IF EXISTS receipt_seq")
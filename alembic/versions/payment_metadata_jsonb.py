@@ -0,0 +1,40 @@
+"""store payment metadata as jsonb
+
+Revision ID: payment_metadata_jsonb_001
+Revises: add_invoice_number_trigger_001
+Create Date: 2026-10-16 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers
+revision = 'payment_metadata_jsonb_001'
+down_revision = 'add_invoice_number_trigger_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Convert payments.payment_metadata from JSON text to JSONB."""
+    op.alter_column(
+        'payments',
+        'payment_metadata',
+        type_=postgresql.JSONB(),
+        existing_type=sa.Text(),
+        existing_nullable=True,
+        postgresql_using='payment_metadata::jsonb',
+    )
+
+
+def downgrade() -> None:
+    """Convert payments.payment_metadata back to text."""
+    op.alter_column(
+        'payments',
+        'payment_metadata',
+        type_=sa.Text(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=True,
+        postgresql_using='payment_metadata::text',
+    )
@@ -139,7 +139,6 @@ async def create_menu(
         }
         menu = await mess_repo.create(menu_data)
         await db.commit()
-        await db.refresh(menu)
 
     # Convert to response dict
     return MessMenuResponse(**convert_menu_to_response(menu))
@@ -165,9 +165,6 @@ async def create_room(
     room = await room_repo.create(room_data)
     await db.commit()
     
-    # ✅ FIX: Refresh to get all fields
-    await db.refresh(room)
-    
     return room
 
 
@@ -403,9 +400,6 @@ async def create_bed(
 
     bed = await bed_repo.create(bed_data)
     await db.commit()
-    
-    # ✅ FIX: Refresh to get all fields
-    await db.refresh(bed)
 
     return bed
 
@@ -18,7 +18,7 @@ from app.models.hostel import Plan, Subscription
 from app.repositories.subscription import PlanRepository, SubscriptionRepository
 from app.core.rbac import require_role, check_hostel_access
 from app.api.deps import get_current_user
-from app.services.subscription import SubscriptionService
+from app.services.subscription import SubscriptionService, invalidate_subscription_cache
 
 router = APIRouter(prefix="/subscriptions", tags=["Subscriptions"])
 
@@ -117,6 +117,7 @@ async def update_subscription(
     update_data = request.model_dump(exclude_unset=True)
     subscription = await subscription_repo.update(subscription_id, update_data)
     await db.commit()
+    await invalidate_subscription_cache(subscription.hostel_id)
 
     return subscription
 
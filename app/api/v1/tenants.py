@@ -121,7 +121,6 @@ async def create_tenant(
     try:
         tenant = await tenant_repo.create(tenant_data)
         await db.commit()
-        await db.refresh(tenant)
         return tenant
     except IntegrityError as e:
         await db.rollback()
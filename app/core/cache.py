@@ -0,0 +1,150 @@
+"""Caching utilities."""
+
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+import orjson
+import redis.asyncio as redis
+
+from app.config import settings
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Compare-and-delete, so a holder whose lock expired can't delete the next
+# holder's lock
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed TTL.
+
+    Intended for small, per-process lookups of stable data. It is not
+    shared between workers, so keep TTLs short enough to bound staleness.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry, returning its value if present."""
+        entry = self._data.pop(key, None)
+        return entry[1] if entry is not None else default
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisCache:
+    """Redis-backed JSON cache shared between workers.
+
+    Lookups degrade to cache misses when caching is disabled or Redis is
+    unavailable, so callers always fall back to the database.
+    """
+
+    def __init__(self):
+        self.redis_client: Optional[redis.Redis] = None
+        self.enabled = settings.cache_enabled
+
+    async def init(self):
+        """Initialize Redis connection."""
+        if self.enabled:
+            self.redis_client = redis.from_url(str(settings.redis_url))
+
+    async def close(self):
+        """Close Redis connection."""
+        if self.redis_client:
+            await self.redis_client.close()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the decoded value for a key, or None on miss."""
+        if not self.redis_client:
+            return None
+        try:
+            raw = await self.redis_client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Cache read failed for {key}: {e}")
+            return None
+        return orjson.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        """Store a JSON-serializable value with a TTL in seconds."""
+        if not self.redis_client:
+            return
+        try:
+            await self.redis_client.setex(key, ttl, orjson.dumps(value))
+        except redis.RedisError as e:
+            logger.warning(f"Cache write failed for {key}: {e}")
+
+    async def delete(self, *keys: str) -> None:
+        """Invalidate keys."""
+        if not self.redis_client:
+            return
+        try:
+            await self.redis_client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"Cache delete failed for {keys}: {e}")
+
+    async def acquire_lock(self, key: str, ttl: int) -> Optional[str]:
+        """Take a cross-worker lock with SET NX EX.
+
+        Returns a token identifying this holder, or None if the lock is held
+        elsewhere or Redis errors (fail closed). When Redis is not configured
+        there are no other workers to coordinate with, so the lock is always
+        granted. Release it with release_lock(key, token).
+        """
+        token = secrets.token_hex(16)
+        if not self.redis_client:
+            return token
+        try:
+            acquired = await self.redis_client.set(key, token, nx=True, ex=ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Lock acquire failed for {key}: {e}")
+            return None
+        return token if acquired else None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """Release a lock only if it is still held under this token."""
+        if not self.redis_client:
+            return
+        try:
+            await self.redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, key, token)
+        except redis.RedisError as e:
+            logger.warning(f"Lock release failed for {key}: {e}")
+
+# Global Redis cache instance
+redis_cache = RedisCache()
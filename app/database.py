@@ -1,12 +1,28 @@
 """Database configuration and session management."""
 
+import asyncio
+from contextlib import AsyncExitStack
 from typing import AsyncGenerator
 
+import orjson
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 
 from app.config import settings
 
+# Skip Postgres JIT for asyncpg connections; it only slows down the
+# short OLTP queries (and asyncpg's type introspection) we run.
+_connect_args = {}
+if "asyncpg" in str(settings.database_url):
+    _connect_args["server_settings"] = {"jit": "off"}
+
+
+def _json_serializer(value) -> str:
+    """Serialize JSON/JSONB column values with orjson."""
+    return orjson.dumps(value).decode()
+
+
 # Create async engine
 engine = create_async_engine(
     str(settings.database_url),
@@ -14,6 +30,10 @@ engine = create_async_engine(
     pool_size=settings.database_pool_size,
     max_overflow=settings.database_max_overflow,
     pool_pre_ping=True,
+    query_cache_size=settings.database_query_cache_size,
+    connect_args=_connect_args,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
 )
 
 # Create async session factory
@@ -44,6 +64,20 @@ async def init_db() -> None:
         await conn.run_sync(Base.metadata.create_all)
 
 
+async def warm_up_pool() -> None:
+    """Open pool_size connections up front so early requests don't pay connect cost."""
+
+    async def _checkout(stack: AsyncExitStack) -> None:
+        conn = await stack.enter_async_context(engine.connect())
+        await conn.execute(text("SELECT 1"))
+
+    # Hold every connection until all are open so each checkout creates a new one
+    async with AsyncExitStack() as stack:
+        await asyncio.gather(
+            *(_checkout(stack) for _ in range(settings.database_pool_size))
+        )
+
+
 async def close_db() -> None:
     """Close database connections."""
     await engine.dispose()
\ No newline at end of file
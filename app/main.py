@@ -6,7 +6,7 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.database import init_db, close_db
+from app.database import init_db, close_db, warm_up_pool
 from app.exceptions import AppException
 from app.core.middleware import (
     RequestIDMiddleware,
@@ -14,6 +14,7 @@ from app.core.middleware import (
     SecurityHeadersMiddleware,
 )
 from app.core.rate_limit import rate_limiter
+from app.core.cache import redis_cache
 from app.logging_config import setup_logging, get_logger
 from app.api.v1.router import api_router
 
@@ -31,7 +32,9 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting application...")
     await init_db()
+    await warm_up_pool()
     await rate_limiter.init()
+    await redis_cache.init()
     
     # NEW: Schedule visitor tasks
     scheduler = schedule_visitor_tasks()
@@ -48,6 +51,7 @@ async def lifespan(app: FastAPI):
     
     await close_db()
     await rate_limiter.close()
+    await redis_cache.close()
     logger.info("Application shut down successfully")
 
 
@@ -5,13 +5,22 @@ from datetime import date, datetime
 from enum import Enum as PyEnum
 from typing import Optional, List
 
-from sqlalchemy import String, Numeric, ForeignKey, Date, DateTime, Enum, Index, Text
+from sqlalchemy import (
+    DDL, String, Numeric, ForeignKey, Date, DateTime, Enum, Index, Text, Sequence,
+    FetchedValue, event,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 from app.models.base import TimestampMixin
 
 
+# Monotonic sources for the numeric part of invoice and receipt numbers
+invoice_number_seq = Sequence("invoice_seq", metadata=Base.metadata)
+receipt_number_seq = Sequence("receipt_seq", metadata=Base.metadata)
+
+
 class FeeFrequency(str, PyEnum):
     """Fee payment frequency."""
 
@@ -77,7 +86,10 @@ class Invoice(Base, TimestampMixin):
         ForeignKey("fee_schedules.id"), nullable=True
     )
     total_amount: Mapped[Decimal] = mapped_column(Numeric(10,2), nullable=False)
-    invoice_number: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
+    # Assigned by the trg_invoices_number trigger: INV-<hostel>-<YYYYMMDD>-<seq hex>
+    invoice_number: Mapped[str] = mapped_column(
+        String(50), unique=True, nullable=False, server_default=FetchedValue()
+    )
     amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     # NO TAX - total_amount equals amount
     
@@ -127,13 +139,16 @@ class Payment(Base, TimestampMixin):
     idempotency_key: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     
     receipt_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
-    receipt_number: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    # Assigned by the trg_payments_receipt_number trigger once status is SUCCESS
+    receipt_number: Mapped[Optional[str]] = mapped_column(
+        String(50), nullable=True, server_onupdate=FetchedValue()
+    )
     
     payment_method: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     paid_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     
     # RENAMED: metadata -> payment_metadata (metadata is reserved in SQLAlchemy)
-    payment_metadata: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON as text
+    payment_metadata: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     
     # Relationships
@@ -148,4 +163,52 @@ class Payment(Base, TimestampMixin):
         Index("idx_payments_idempotency_key", "idempotency_key"),
         Index("idx_payments_status", "status"),
         Index("idx_payments_created_at", "created_at"),
-    )
\ No newline at end of file
+    )
+
+
+# Server-side number generation. The migration add_invoice_number_trigger
+# installs the same objects on existing databases.
+INVOICE_NUMBER_FUNCTION_DDL = """
+CREATE OR REPLACE FUNCTION set_invoice_number() RETURNS trigger AS $$
+BEGIN
+    IF NEW.invoice_number IS NULL THEN
+        NEW.invoice_number := 'INV-' || NEW.hostel_id || '-'
+            || to_char(timezone('UTC', now()), 'YYYYMMDD') || '-'
+            || lpad(upper(to_hex(nextval('invoice_seq'))), 8, '0');
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+INVOICE_NUMBER_TRIGGER_DDL = """
+CREATE TRIGGER trg_invoices_number
+    BEFORE INSERT ON invoices
+    FOR EACH ROW EXECUTE FUNCTION set_invoice_number()
+"""
+
+RECEIPT_NUMBER_FUNCTION_DDL = """
+CREATE OR REPLACE FUNCTION set_receipt_number() RETURNS trigger AS $$
+BEGIN
+    IF NEW.status = 'SUCCESS' AND NEW.receipt_number IS NULL THEN
+        NEW.receipt_number := 'RCP-' || NEW.hostel_id || '-'
+            || to_char(timezone('UTC', now()), 'YYYYMMDD') || '-'
+            || lpad(upper(to_hex(nextval('receipt_seq'))), 8, '0');
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+RECEIPT_NUMBER_TRIGGER_DDL = """
+CREATE TRIGGER trg_payments_receipt_number
+    BEFORE INSERT OR UPDATE OF status ON payments
+    FOR EACH ROW EXECUTE FUNCTION set_receipt_number()
+"""
+
+for _table, _statements in (
+    (Invoice.__table__, (INVOICE_NUMBER_FUNCTION_DDL, INVOICE_NUMBER_TRIGGER_DDL)),
+    (Payment.__table__, (RECEIPT_NUMBER_FUNCTION_DDL, RECEIPT_NUMBER_TRIGGER_DDL)),
+):
+    for _statement in _statements:
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
@@ -3,7 +3,7 @@
 from enum import Enum as PyEnum
 from typing import Optional, List
 
-from sqlalchemy import String, Integer, Boolean, ForeignKey, Enum, Index
+from sqlalchemy import String, Integer, Boolean, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -43,6 +43,11 @@ class Room(Base, TimestampMixin, SoftDeleteMixin):
     __table_args__ = (
         Index("idx_rooms_hostel_id", "hostel_id"),
         Index("idx_rooms_hostel_number", "hostel_id", "number", unique=True),
+        # Serves per-hostel counts of live rooms (subscription limits)
+        Index(
+            "idx_rooms_hostel_active", "hostel_id",
+            postgresql_where=text("is_deleted = false"),
+        ),
     )
 
 
@@ -80,4 +85,9 @@ class Bed(Base, TimestampMixin, SoftDeleteMixin):
         Index("idx_beds_room_id", "room_id"),
         Index("idx_beds_hostel_id", "hostel_id"),
         Index("idx_beds_tenant_id", "tenant_id"),
+        # Serves per-hostel lookups of live beds
+        Index(
+            "idx_beds_hostel_active", "hostel_id",
+            postgresql_where=text("is_deleted = false"),
+        ),
     )
\ No newline at end of file
@@ -4,7 +4,7 @@ from enum import Enum as PyEnum
 from typing import Optional, List
 from datetime import date
 
-from sqlalchemy import String, Integer, Date, ForeignKey, Enum, Text
+from sqlalchemy import String, Integer, Date, ForeignKey, Enum, Text, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -99,6 +99,14 @@ class TenantProfile(Base, TimestampMixin, SoftDeleteMixin):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Serves per-hostel counts of live tenants (subscription limits)
+        Index(
+            "idx_tenant_profiles_hostel_active", "hostel_id",
+            postgresql_where=text("is_deleted = false"),
+        ),
+    )
+
 
 class CheckInOutStatus(str, PyEnum):
     """Check-in/out status."""
@@ -55,14 +55,12 @@ class TenantRepository(BaseRepository[TenantProfile]):
 
     async def count_by_hostel(self, hostel_id: int) -> int:
         """Count non-deleted tenants in a hostel."""
-        query = select(func.count(TenantProfile.id)).where(
-            TenantProfile.hostel_id == hostel_id
+        # Plain count(*) so the partial index on live tenants can answer it
+        query = select(func.count()).select_from(TenantProfile).where(
+            TenantProfile.hostel_id == hostel_id,
+            TenantProfile.is_deleted == False,
         )
         
-        # Filter out soft-deleted records
-        if hasattr(TenantProfile, 'is_deleted'):
-            query = query.where(TenantProfile.is_deleted == False)
-        
         result = await self.db.execute(query)
         return result.scalar_one()
 
@@ -99,6 +99,5 @@ class ComplaintService:
 
         comment_obj = await self.comment_repo.create(comment_data)
         await self.db.commit()
-        await self.db.refresh(comment_obj)
 
         return comment_obj
\ No newline at end of file
@@ -4,13 +4,15 @@ from typing import List, Optional
 from datetime import datetime
 import secrets
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, exists, lambda_stmt, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.models.hostel import Hostel
 from app.models.user import User, UserRole
 from app.models.associations import user_hostel_association
 from app.repositories.hostel import HostelRepository
 from app.repositories.user import UserRepository
+from app.core.cache import TTLCache
 from app.exceptions import (
     NotFoundError,
     ConflictError,
@@ -21,6 +23,19 @@ from app.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# admin_code -> (id, role, email) row; codes are stable, so a short TTL is enough
+_admin_code_cache = TTLCache(maxsize=1024, ttl=300)
+
+# Association lookup shared by most admin operations; compiled once per process.
+_IS_ASSOCIATED = lambda_stmt(
+    lambda: select(
+        exists().where(
+            user_hostel_association.c.user_id == bindparam("uid"),
+            user_hostel_association.c.hostel_id == bindparam("hid"),
+        )
+    )
+)
+
 
 class HostelAdminService:
     """Service for hostel admin multi-hostel management."""
@@ -45,13 +60,7 @@ class HostelAdminService:
         Returns:
             Generated admin code
         """
-        user = await self.user_repo.get(admin_id)
-        
-        if not user:
-            raise NotFoundError("User not found")
-        
-        if user.role != UserRole.HOSTEL_ADMIN:
-            raise ValidationError("User is not a hostel admin")
+        admin = await self._require_hostel_admin(admin_id, User.admin_code)
 
         # Generate unique code
         admin_code = self.generate_admin_code()
@@ -61,9 +70,13 @@ class HostelAdminService:
             admin_code = self.generate_admin_code()
 
         # Update user with admin code
+        old_code = admin.admin_code
         await self.user_repo.update(admin_id, {"admin_code": admin_code})
         await self.db.commit()
 
+        if old_code:
+            _admin_code_cache.pop(old_code, None)
+
         logger.info(f"Generated admin code for user {admin_id}: {admin_code}")
         
         return admin_code
@@ -119,14 +132,13 @@ class HostelAdminService:
             "is_active": True,
         }
 
+        # create() flushes and loads server defaults, so no refresh is needed
         hostel = await self.hostel_repo.create(hostel_data)
-        await self.db.flush()
 
         # Associate hostel with admin
         await self._associate_hostel_with_admin(admin.id, hostel.id)
         
         await self.db.commit()
-        await self.db.refresh(hostel)
 
         logger.info(
             f"Registered hostel {hostel.name} (ID: {hostel.id}) "
@@ -147,25 +159,21 @@ class HostelAdminService:
             admin_id: Hostel admin user ID
             hostel_id: Hostel ID to add
         """
-        # Verify admin exists and is hostel admin
-        admin = await self.user_repo.get(admin_id)
-        if not admin:
-            raise NotFoundError("Admin not found")
-        
-        if admin.role != UserRole.HOSTEL_ADMIN:
-            raise ValidationError("User is not a hostel admin")
-
-        # Verify hostel exists
-        hostel = await self.hostel_repo.get(hostel_id)
-        if not hostel:
+        # Verify admin role and hostel existence in a single query
+        hostel_exists = (
+            select(Hostel.id)
+            .where(Hostel.id == hostel_id, Hostel.is_deleted == False)
+            .exists()
+        )
+        row = await self._require_hostel_admin(
+            admin_id, hostel_exists.label("hostel_exists")
+        )
+        if not row.hostel_exists:
             raise NotFoundError("Hostel not found")
 
-        # Check if already associated
-        if await self._is_hostel_associated(admin_id, hostel_id):
+        # Associate hostel with admin (no-op if already associated)
+        if not await self._associate_hostel_with_admin(admin_id, hostel_id):
             raise ConflictError("Hostel already associated with this admin")
-
-        # Associate hostel with admin
-        await self._associate_hostel_with_admin(admin_id, hostel_id)
         await self.db.commit()
 
         logger.info(f"Added hostel {hostel_id} to admin {admin_id}")
@@ -206,13 +214,7 @@ class HostelAdminService:
         Returns:
             List of hostels
         """
-        admin = await self.user_repo.get(admin_id)
-        
-        if not admin:
-            raise NotFoundError("Admin not found")
-        
-        if admin.role != UserRole.HOSTEL_ADMIN:
-            raise ValidationError("User is not a hostel admin")
+        await self._require_hostel_admin(admin_id)
 
         # Get hostels through relationship
         result = await self.db.execute(
@@ -242,13 +244,18 @@ class HostelAdminService:
             to_admin_id: New admin ID
         """
         # Verify both admins exist and are hostel admins
-        from_admin = await self.user_repo.get(from_admin_id)
-        to_admin = await self.user_repo.get(to_admin_id)
+        result = await self.db.execute(
+            select(User.id, User.role).where(
+                User.id.in_([from_admin_id, to_admin_id]),
+                User.is_deleted == False,
+            )
+        )
+        roles = {row.id: row.role for row in result}
 
-        if not from_admin or not to_admin:
+        if from_admin_id not in roles or to_admin_id not in roles:
             raise NotFoundError("One or both admins not found")
 
-        if from_admin.role != UserRole.HOSTEL_ADMIN or to_admin.role != UserRole.HOSTEL_ADMIN:
+        if any(role != UserRole.HOSTEL_ADMIN for role in roles.values()):
             raise ValidationError("Both users must be hostel admins")
 
         # Verify hostel exists
@@ -272,34 +279,66 @@ class HostelAdminService:
 
     # Private helper methods
 
+    async def _require_hostel_admin(self, admin_id: int, *columns):
+        """
+        Ensure the user exists and is a hostel admin.
+        
+        Only User.role (plus any extra ``columns``) is selected, and the
+        resulting row is returned for callers that need those values.
+        """
+        result = await self.db.execute(
+            select(User.role, *columns).where(
+                User.id == admin_id, User.is_deleted == False
+            )
+        )
+        row = result.first()
+        if not row:
+            raise NotFoundError("Admin not found")
+
+        if row.role != UserRole.HOSTEL_ADMIN:
+            raise ValidationError("User is not a hostel admin")
+
+        return row
+
     async def _admin_code_exists(self, admin_code: str) -> bool:
         """Check if admin code already exists."""
         result = await self.db.execute(
-            select(User).where(User.admin_code == admin_code)
+            select(1).where(User.admin_code == admin_code).limit(1)
         )
-        return result.scalar_one_or_none() is not None
+        return result.scalar() is not None
+
+    async def _get_admin_by_code(self, admin_code: str):
+        """Get admin (id, role, email) by admin code, cached in-process."""
+        admin = _admin_code_cache.get(admin_code)
+        if admin is not None:
+            return admin
 
-    async def _get_admin_by_code(self, admin_code: str) -> Optional[User]:
-        """Get admin user by admin code."""
         result = await self.db.execute(
-            select(User).where(User.admin_code == admin_code)
+            select(User.id, User.role, User.email).where(User.admin_code == admin_code)
         )
-        return result.scalar_one_or_none()
+        admin = result.first()
+        if admin is not None:
+            _admin_code_cache.set(admin_code, admin)
+        return admin
 
     async def _is_hostel_associated(self, admin_id: int, hostel_id: int) -> bool:
         """Check if hostel is associated with admin."""
         result = await self.db.execute(
-            select(user_hostel_association).where(
-                user_hostel_association.c.user_id == admin_id,
-                user_hostel_association.c.hostel_id == hostel_id,
-            )
+            _IS_ASSOCIATED, {"uid": admin_id, "hid": hostel_id}
         )
-        return result.first() is not None
+        return bool(result.scalar())
 
-    async def _associate_hostel_with_admin(self, admin_id: int, hostel_id: int) -> None:
-        """Associate hostel with admin in association table."""
-        stmt = user_hostel_association.insert().values(
-            user_id=admin_id,
-            hostel_id=hostel_id,
+    async def _associate_hostel_with_admin(self, admin_id: int, hostel_id: int) -> bool:
+        """
+        Associate hostel with admin in association table.
+        
+        Returns:
+            False if the association already existed
+        """
+        stmt = (
+            pg_insert(user_hostel_association)
+            .values(user_id=admin_id, hostel_id=hostel_id)
+            .on_conflict_do_nothing()
         )
-        await self.db.execute(stmt)
\ No newline at end of file
+        result = await self.db.execute(stmt)
+        return result.rowcount == 1
\ No newline at end of file
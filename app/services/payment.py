@@ -1,15 +1,17 @@
-"""Payment service (SYNC VERSION)."""
+"""Payment service."""
 
 from decimal import Decimal
 from datetime import datetime, date
-import secrets
-import json
+from typing import Any, Dict, List
 
-from sqlalchemy.orm import Session
+from sqlalchemy import case, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.fee import Invoice, Payment, InvoiceStatus, PaymentStatus
+from app.models.tenant import TenantProfile
 from app.repositories.payment import InvoiceRepository, PaymentRepository
 from app.repositories.tenant import TenantRepository
+from app.services.report import invalidate_report_cache
 from app.adapters.payment.base import PaymentProvider
 from app.core.security import generate_idempotency_key
 from app.exceptions import NotFoundError, PaymentError, ValidationError
@@ -19,14 +21,14 @@ from app.config import settings
 class PaymentService:
     """Payment service."""
 
-    def __init__(self, db: Session, payment_provider: PaymentProvider):
+    def __init__(self, db: AsyncSession, payment_provider: PaymentProvider):
         self.db = db
         self.invoice_repo = InvoiceRepository(Invoice, db)
         self.payment_repo = PaymentRepository(Payment, db)
-        self.tenant_repo = TenantRepository(None, db)
+        self.tenant_repo = TenantRepository(TenantProfile, db)
         self.payment_provider = payment_provider
 
-    def generate_invoice(
+    async def generate_invoice(
         self,
         hostel_id: int,
         tenant_id: int,
@@ -36,23 +38,24 @@ class PaymentService:
         notes: str = None,
     ) -> Invoice:
         """Generate an invoice for a tenant."""
-        # Verify tenant exists
-        tenant = self.tenant_repo.get(tenant_id)
-        if not tenant or tenant.hostel_id != hostel_id:
+        # Verify tenant exists in this hostel (no need to load the full profile)
+        result = await self.db.execute(
+            select(TenantProfile.hostel_id).where(
+                TenantProfile.id == tenant_id, TenantProfile.is_deleted == False
+            )
+        )
+        if result.scalar_one_or_none() != hostel_id:
             raise NotFoundError("Tenant not found")
 
         # NO TAX - total_amount equals amount
         total_amount = amount
 
-        # Generate invoice number
-        invoice_number = f"INV-{hostel_id}-{datetime.utcnow().strftime('%Y%m%d')}-{secrets.token_hex(4).upper()}"
-
         invoice_data = {
             "hostel_id": hostel_id,
             "tenant_id": tenant_id,
             "fee_schedule_id": fee_schedule_id,
-            "invoice_number": invoice_number,
             "amount": amount,
+            "total_amount": total_amount,
             "due_date": due_date,
             "status": InvoiceStatus.PENDING,
         }
@@ -60,12 +63,58 @@ class PaymentService:
         if notes:
             invoice_data["notes"] = notes
 
-        invoice = self.invoice_repo.create(invoice_data)
-        self.db.commit()
+        invoice = await self.invoice_repo.create(invoice_data)
+        await self.db.commit()
+        invalidate_report_cache(hostel_id)
 
         return invoice
 
-    def initiate_payment(
+    async def generate_invoices_bulk(self, items: List[Dict[str, Any]]) -> List[Invoice]:
+        """
+        Generate many invoices at once (imports, migrations).
+        
+        Each item takes the same fields as generate_invoice. All rows go out
+        in one multi-row INSERT; invoice numbers are assigned by the database.
+        """
+        if not items:
+            return []
+
+        # Verify every tenant belongs to the hostel it is billed under
+        tenant_ids = {item["tenant_id"] for item in items}
+        result = await self.db.execute(
+            select(TenantProfile.id, TenantProfile.hostel_id).where(
+                TenantProfile.id.in_(tenant_ids), TenantProfile.is_deleted == False
+            )
+        )
+        tenant_hostels = dict(result.all())
+        for item in items:
+            if tenant_hostels.get(item["tenant_id"]) != item["hostel_id"]:
+                raise NotFoundError(f"Tenant {item['tenant_id']} not found")
+
+        rows = [
+            {
+                "hostel_id": item["hostel_id"],
+                "tenant_id": item["tenant_id"],
+                "fee_schedule_id": item.get("fee_schedule_id"),
+                "amount": item["amount"],
+                "total_amount": item["amount"],
+                "due_date": item["due_date"],
+                "status": InvoiceStatus.PENDING,
+                "notes": item.get("notes"),
+            }
+            for item in items
+        ]
+
+        result = await self.db.scalars(insert(Invoice).returning(Invoice), rows)
+        invoices = list(result.all())
+        await self.db.commit()
+
+        for hostel_id in {invoice.hostel_id for invoice in invoices}:
+            invalidate_report_cache(hostel_id)
+
+        return invoices
+
+    async def initiate_payment(
         self,
         invoice_id: int,
         tenant_id: int,
@@ -74,7 +123,7 @@ class PaymentService:
     ) -> Payment:
         """Initiate a payment for an invoice."""
         # Get invoice
-        invoice = self.invoice_repo.get(invoice_id)
+        invoice = await self.invoice_repo.get(invoice_id)
         if not invoice:
             raise NotFoundError("Invoice not found")
 
@@ -100,19 +149,27 @@ class PaymentService:
             "idempotency_key": idempotency_key,
         }
 
-        payment = self.payment_repo.create(payment_data)
-        self.db.commit()
+        # INSERT ... RETURNING hydrates the payment in one round trip.
+        # Commit before calling the provider so no transaction sits idle
+        # across the gateway request, and the attempt is always recorded.
+        result = await self.db.scalars(
+            insert(Payment).values(**payment_data).returning(Payment)
+        )
+        payment = result.one()
+        await self.db.commit()
 
         # Create payment order with provider
         try:
-            tenant = self.tenant_repo.get(tenant_id)
+            tenant = await self.tenant_repo.get(tenant_id)
+            # Relationships can't lazy-load on an AsyncSession
+            await self.db.refresh(tenant, attribute_names=["user"])
             customer_info = {
                 "name": tenant.full_name,
                 "phone": tenant.user.phone if tenant.user else "",
                 "email": tenant.user.email if tenant.user else "",
             }
 
-            order = self.payment_provider.create_order(
+            order = await self.payment_provider.create_order(
                 amount=amount,
                 currency=settings.payment_currency,
                 order_id=str(payment.id),
@@ -121,92 +178,94 @@ class PaymentService:
 
             # Update payment with provider order ID
             # CHANGED: metadata -> payment_metadata
-            self.payment_repo.update(
+            await self.payment_repo.update(
                 payment.id,
                 {
                     "transaction_id": order["order_id"],
                     "status": PaymentStatus.PROCESSING,
-                    "payment_metadata": json.dumps(order.get("metadata", {})),
+                    "payment_metadata": order.get("metadata", {}),
                 },
             )
-            self.db.commit()
+            await self.db.commit()
 
             payment.transaction_id = order["order_id"]
 
         except Exception as e:
             # Mark payment as failed
-            self.payment_repo.update(
+            await self.db.rollback()
+            await self.payment_repo.update(
                 payment.id,
                 {"status": PaymentStatus.FAILED, "error_message": str(e)},
             )
-            self.db.commit()
+            await self.db.commit()
             raise PaymentError(f"Failed to initiate payment: {str(e)}")
 
         return payment
 
-    def confirm_payment(self, payment_id: int, transaction_id: str) -> Payment:
+    async def confirm_payment(self, payment_id: int, transaction_id: str) -> Payment:
         """Confirm payment after successful transaction."""
-        payment = self.payment_repo.get(payment_id)
+        payment = await self.payment_repo.get(payment_id)
         if not payment:
             raise NotFoundError("Payment not found")
 
         # Verify payment with provider
         try:
-            verification = self.payment_provider.verify_payment(transaction_id)
+            verification = await self.payment_provider.verify_payment(transaction_id)
 
             if verification["status"] == "success":
-                # Update payment
-                receipt_number = f"RCP-{payment.hostel_id}-{datetime.utcnow().strftime('%Y%m%d')}-{secrets.token_hex(4).upper()}"
-
-                self.payment_repo.update(
+                # Update payment (receipt_number is assigned by the database)
+                await self.payment_repo.update(
                     payment_id,
                     {
                         "status": PaymentStatus.SUCCESS,
                         "paid_at": datetime.utcnow(),
-                        "receipt_number": receipt_number,
                         "payment_method": verification.get("metadata", {}).get("payment_method"),
                     },
                 )
 
-                # Update invoice
-                invoice = self.invoice_repo.get(payment.invoice_id)
-                new_paid_amount = invoice.paid_amount + payment.amount
-
-                if new_paid_amount >= invoice.amount:
-                    invoice_status = InvoiceStatus.PAID
-                else:
-                    invoice_status = InvoiceStatus.PARTIAL
-
-                self.invoice_repo.update(
-                    payment.invoice_id,
-                    {
-                        "paid_amount": new_paid_amount,
-                        "status": invoice_status,
-                        "paid_at": datetime.utcnow(),
-                    },
+                # Update invoice atomically; concurrent partial payments
+                # can't overwrite each other's paid_amount
+                new_paid_amount = Invoice.paid_amount + payment.amount
+                await self.db.execute(
+                    update(Invoice)
+                    .where(Invoice.id == payment.invoice_id)
+                    .values(
+                        paid_amount=new_paid_amount,
+                        status=case(
+                            (
+                                new_paid_amount >= Invoice.amount,
+                                literal(InvoiceStatus.PAID, Invoice.status.type),
+                            ),
+                            else_=literal(InvoiceStatus.PARTIAL, Invoice.status.type),
+                        ),
+                        paid_at=datetime.utcnow(),
+                    )
+                    .execution_options(synchronize_session=False)
                 )
 
-                self.db.commit()
+                await self.db.commit()
+                invalidate_report_cache(payment.hostel_id)
 
                 # Generate receipt (placeholder for now)
                 payment.receipt_url = f"/api/v1/payments/{payment_id}/receipt"
 
             else:
-                self.payment_repo.update(
+                await self.payment_repo.update(
                     payment_id,
                     {
                         "status": PaymentStatus.FAILED,
                         "error_message": verification.get("error", "Payment failed"),
                     },
                 )
-                self.db.commit()
+                await self.db.commit()
 
         except Exception as e:
-            self.payment_repo.update(
+            await self.db.rollback()
+            await self.payment_repo.update(
                 payment_id,
                 {"status": PaymentStatus.FAILED, "error_message": str(e)},
             )
-            self.db.commit()
+            await self.db.commit()
             raise PaymentError(f"Payment verification failed: {str(e)}")
 
-        return self.payment_repo.get(payment_id)
\ No newline at end of file
+        return await self.payment_repo.get(payment_id)
\ No newline at end of file
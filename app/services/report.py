@@ -1,8 +1,8 @@
 from datetime import date
 from decimal import Decimal
-from typing import Dict, List
+from typing import Awaitable, Callable, Dict, List, Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import bindparam, func, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.room import Bed
@@ -11,6 +11,62 @@ from app.models.fee import Invoice, Payment, PaymentStatus, InvoiceStatus
 from app.models.complaint import Complaint, ComplaintStatus
 from app.models.hostel import Hostel, Subscription, SubscriptionStatus
 from app.models.support import SupportTicket, TicketStatus
+from app.core.cache import TTLCache
+
+
+# Dashboards are polled and refresh-clicked; serve repeats from memory for a
+# short window. Keys carry a per-hostel version (None = global totals) that
+# invalidate_report_cache() bumps when payments change the numbers.
+REPORT_CACHE_TTL_SECONDS = 30
+_report_cache = TTLCache(maxsize=1024, ttl=REPORT_CACHE_TTL_SECONDS)
+_report_versions: Dict[Optional[int], int] = {}
+
+
+def invalidate_report_cache(hostel_id: int) -> None:
+    """Force cached stats for a hostel and global totals to be recomputed."""
+    for key in (hostel_id, None):
+        _report_versions[key] = _report_versions.get(key, 0) + 1
+
+
+# Hot dashboard aggregates, built once per process. lambda_stmt caches the
+# compiled SQL so warm requests skip statement construction and compilation.
+_OCCUPANCY_TOTAL = lambda_stmt(
+    lambda: select(func.count(Bed.id)).where(
+        Bed.hostel_id == bindparam("hid"), Bed.is_deleted == False
+    )
+)
+_OCCUPIED_BEDS = lambda_stmt(
+    lambda: select(func.count(Bed.id)).where(
+        Bed.hostel_id == bindparam("hid"), Bed.is_occupied == True, Bed.is_deleted == False
+    )
+)
+_HOSTEL_TENANTS = lambda_stmt(
+    lambda: select(func.count(TenantProfile.id)).where(
+        TenantProfile.hostel_id == bindparam("hid")
+    )
+)
+_TOTAL_HOSTELS = lambda_stmt(
+    lambda: select(func.count(Hostel.id)).where(Hostel.is_deleted == False)
+)
+_ACTIVE_HOSTELS = lambda_stmt(
+    lambda: select(func.count(Hostel.id)).where(
+        Hostel.is_active == True, Hostel.is_deleted == False
+    )
+)
+_TOTAL_TENANTS = lambda_stmt(lambda: select(func.count(TenantProfile.id)))
+_TOTAL_REVENUE = lambda_stmt(
+    lambda: select(func.sum(Payment.amount)).where(Payment.status == PaymentStatus.SUCCESS)
+)
+_ACTIVE_SUBSCRIPTIONS = lambda_stmt(
+    lambda: select(func.count(Subscription.id)).where(
+        Subscription.status == SubscriptionStatus.ACTIVE
+    )
+)
+_PENDING_TICKETS = lambda_stmt(
+    lambda: select(func.count(SupportTicket.id)).where(
+        SupportTicket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS])
+    )
+)
 
 
 class ReportService:
@@ -19,20 +75,55 @@ class ReportService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @staticmethod
+    async def _cached(
+        key: tuple, hostel_id: Optional[int], loader: Callable[[], Awaitable[Dict]]
+    ) -> Dict:
+        """Return a cached report or compute and store it."""
+        key = (*key, _report_versions.get(hostel_id, 0))
+        value = _report_cache.get(key)
+        if value is None:
+            value = await loader()
+            _report_cache.set(key, value)
+        return dict(value)
+
     async def get_occupancy_stats(self, hostel_id: int) -> Dict:
         """Get occupancy statistics for a hostel."""
-        # Total beds
-        total_beds_query = select(func.count(Bed.id)).where(
-            Bed.hostel_id == hostel_id, Bed.is_deleted == False
+        return await self._cached(
+            ("occupancy", hostel_id), hostel_id,
+            lambda: self._compute_occupancy_stats(hostel_id),
         )
-        result = await self.db.execute(total_beds_query)
+
+    async def get_income_stats(
+        self, hostel_id: int, date_from: date = None, date_to: date = None
+    ) -> Dict:
+        """Get income statistics."""
+        return await self._cached(
+            ("income", hostel_id, date_from, date_to), hostel_id,
+            lambda: self._compute_income_stats(hostel_id, date_from, date_to),
+        )
+
+    async def get_super_admin_dashboard(self) -> Dict:
+        """Get Super Admin dashboard statistics."""
+        return await self._cached(
+            ("super_admin_dashboard",), None, self._compute_super_admin_dashboard
+        )
+
+    async def get_hostel_dashboard(self, hostel_id: int) -> Dict:
+        """Get Hostel Admin dashboard statistics."""
+        return await self._cached(
+            ("hostel_dashboard", hostel_id), hostel_id,
+            lambda: self._compute_hostel_dashboard(hostel_id),
+        )
+
+    async def _compute_occupancy_stats(self, hostel_id: int) -> Dict:
+        """Compute occupancy statistics for a hostel."""
+        # Total beds
+        result = await self.db.execute(_OCCUPANCY_TOTAL, {"hid": hostel_id})
         total_beds = result.scalar() or 0
 
         # Occupied beds
-        occupied_beds_query = select(func.count(Bed.id)).where(
-            Bed.hostel_id == hostel_id, Bed.is_occupied == True, Bed.is_deleted == False
-        )
-        result = await self.db.execute(occupied_beds_query)
+        result = await self.db.execute(_OCCUPIED_BEDS, {"hid": hostel_id})
         occupied_beds = result.scalar() or 0
 
         # Calculate occupancy rate
@@ -45,10 +136,10 @@ class ReportService:
             "occupancy_rate": round(occupancy_rate, 2),
         }
 
-    async def get_income_stats(
+    async def _compute_income_stats(
         self, hostel_id: int, date_from: date = None, date_to: date = None
     ) -> Dict:
-        """Get income statistics."""
+        """Compute income statistics."""
         query = select(
             func.sum(Payment.amount).label("total_revenue"),
             func.count(Payment.id).label("total_payments"),
@@ -108,44 +199,30 @@ class ReportService:
             ),
         }
 
-    async def get_super_admin_dashboard(self) -> Dict:
-        """Get Super Admin dashboard statistics - FIXED."""
+    async def _compute_super_admin_dashboard(self) -> Dict:
+        """Compute Super Admin dashboard statistics - FIXED."""
         # Total hostels
-        total_hostels_query = select(func.count(Hostel.id)).where(Hostel.is_deleted == False)
-        result = await self.db.execute(total_hostels_query)
+        result = await self.db.execute(_TOTAL_HOSTELS)
         total_hostels = result.scalar() or 0
 
         # Active hostels
-        active_hostels_query = select(func.count(Hostel.id)).where(
-            Hostel.is_active == True, Hostel.is_deleted == False
-        )
-        result = await self.db.execute(active_hostels_query)
+        result = await self.db.execute(_ACTIVE_HOSTELS)
         active_hostels = result.scalar() or 0
 
         # Total tenants
-        total_tenants_query = select(func.count(TenantProfile.id))
-        result = await self.db.execute(total_tenants_query)
+        result = await self.db.execute(_TOTAL_TENANTS)
         total_tenants = result.scalar() or 0
 
         # Total revenue
-        revenue_query = select(func.sum(Payment.amount)).where(
-            Payment.status == PaymentStatus.SUCCESS
-        )
-        result = await self.db.execute(revenue_query)
+        result = await self.db.execute(_TOTAL_REVENUE)
         total_revenue = result.scalar() or Decimal("0.00")
 
         # Active subscriptions - FIXED: Added this field
-        active_subs_query = select(func.count(Subscription.id)).where(
-            Subscription.status == SubscriptionStatus.ACTIVE
-        )
-        result = await self.db.execute(active_subs_query)
+        result = await self.db.execute(_ACTIVE_SUBSCRIPTIONS)
         active_subscriptions = result.scalar() or 0
 
         # Pending tickets - FIXED: Added this field
-        pending_tickets_query = select(func.count(SupportTicket.id)).where(
-            SupportTicket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS])
-        )
-        result = await self.db.execute(pending_tickets_query)
+        result = await self.db.execute(_PENDING_TICKETS)
         pending_tickets = result.scalar() or 0
 
         return {
@@ -157,17 +234,14 @@ class ReportService:
             "pending_tickets": pending_tickets,  # FIXED: Added
         }
 
-    async def get_hostel_dashboard(self, hostel_id: int) -> Dict:
-        """Get Hostel Admin dashboard statistics."""
+    async def _compute_hostel_dashboard(self, hostel_id: int) -> Dict:
+        """Compute Hostel Admin dashboard statistics."""
         occupancy = await self.get_occupancy_stats(hostel_id)
         income = await self.get_income_stats(hostel_id)
         complaints = await self.get_complaint_stats(hostel_id)
 
         # Total tenants
-        tenant_query = select(func.count(TenantProfile.id)).where(
-            TenantProfile.hostel_id == hostel_id
-        )
-        result = await self.db.execute(tenant_query)
+        result = await self.db.execute(_HOSTEL_TENANTS, {"hid": hostel_id})
         total_tenants = result.scalar() or 0
 
         return {
@@ -1,8 +1,9 @@
 """Subscription service."""
 
 from datetime import date
-from typing import Dict
+from typing import Dict, Optional
 
+from sqlalchemy import bindparam, func, literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.hostel import Subscription, Plan, PlanTier
@@ -12,6 +13,62 @@ from app.repositories.subscription import SubscriptionRepository, PlanRepository
 from app.repositories.room import RoomRepository, BedRepository
 from app.repositories.tenant import TenantRepository
 from app.exceptions import NotFoundError, SubscriptionLimitError
+from app.core.cache import redis_cache
+from app.config import settings
+
+
+# Redis keys for near-immutable data read on every room/tenant write
+SUBSCRIPTION_CACHE_KEY = "core:sub:{hostel_id}"
+PLAN_CACHE_KEY = "core:plan:{plan_id}"
+
+
+# Limit-check and usage statements run on every room/tenant write. They are
+# built once with bind parameters so each call reuses the compiled form.
+def _live_rows_at_least(model):
+    """SELECT 1 for the (skip+1)-th live row of a hostel, if there is one."""
+    return (
+        select(literal(1))
+        .select_from(model)
+        .where(model.hostel_id == bindparam("hid"), model.is_deleted == False)
+        .offset(bindparam("skip"))
+        .limit(1)
+    )
+
+
+_AT_LEAST = {
+    "rooms": _live_rows_at_least(Room),
+    "tenants": _live_rows_at_least(TenantProfile),
+}
+
+
+def _live_count(model):
+    """Correlated count(*) of a hostel's live rows."""
+    return (
+        select(func.count())
+        .select_from(model)
+        .where(model.hostel_id == bindparam("hid"), model.is_deleted == False)
+        .scalar_subquery()
+    )
+
+
+_FEATURE_USAGE = (
+    select(
+        Plan.id.label("plan_id"),
+        Plan.name,
+        Plan.max_tenants_per_hostel,
+        Plan.max_rooms_per_hostel,
+        _live_count(TenantProfile).label("current_tenants"),
+        _live_count(Room).label("current_rooms"),
+    )
+    .select_from(Subscription)
+    .outerjoin(Plan, Plan.id == Subscription.plan_id)
+    .where(Subscription.hostel_id == bindparam("hid"))
+)
+
+
+async def invalidate_subscription_cache(hostel_id: int) -> None:
+    """Drop the cached subscription snapshot for a hostel."""
+    await redis_cache.delete(SUBSCRIPTION_CACHE_KEY.format(hostel_id=hostel_id))
 
 
 class SubscriptionService:
@@ -25,144 +82,165 @@ class SubscriptionService:
         self.room_repo = RoomRepository(Room, db)
         self.bed_repo = BedRepository(Bed, db)
         self.tenant_repo = TenantRepository(TenantProfile, db)
-        
-        
-    async def check_room_limit(self, hostel_id: int) -> bool:
-        """Check if hostel can add more rooms."""
-        subscription = await self.subscription_repo.get_by_hostel(hostel_id)
-        
-        # ✅ AUTO-CREATE FREE SUBSCRIPTION IF MISSING
-        if not subscription:
-            # Get FREE plan
-            free_plan = await self.plan_repo.get_by_tier(PlanTier.FREE)
-            if free_plan:
-                # Create default subscription
-                from app.models.hostel import SubscriptionStatus
-                from datetime import date, timedelta
-                
-                subscription_data = {
-                    "hostel_id": hostel_id,
-                    "plan_id": free_plan.id,
-                    "status": SubscriptionStatus.TRIAL,
-                    "start_date": date.today(),
-                    "end_date": date.today() + timedelta(days=365),
-                    "auto_renew": False,
-                }
-                subscription = await self.subscription_repo.create(subscription_data)
-                await self.db.commit()
-            else:
-                # No FREE plan exists, allow anyway
-                return True
-
-        plan = await self.plan_repo.get(subscription.plan_id)
-        if not plan:
-            raise NotFoundError("Plan not found")
 
-        # Unlimited rooms
-        if plan.max_rooms_per_hostel is None:
-            return True
+    @staticmethod
+    def _subscription_snapshot(subscription: Subscription) -> Dict:
+        """Cacheable view of the subscription fields the limit checks use."""
+        return {
+            "id": subscription.id,
+            "plan_id": subscription.plan_id,
+            "status": subscription.status.value,
+            "end_date": subscription.end_date.isoformat() if subscription.end_date else None,
+        }
 
-        # Count current rooms (excluding soft-deleted ones)
-        current_count = await self.room_repo.count({
-            "hostel_id": hostel_id,
-            "is_deleted": False
-        })
+    async def _get_subscription(self, hostel_id: int) -> Optional[Dict]:
+        """Get the hostel's subscription snapshot, via Redis when cached."""
+        key = SUBSCRIPTION_CACHE_KEY.format(hostel_id=hostel_id)
+        snapshot = await redis_cache.get(key)
+        if snapshot is None:
+            subscription = await self.subscription_repo.get_by_hostel(hostel_id)
+            if not subscription:
+                return None
+            snapshot = self._subscription_snapshot(subscription)
+            await redis_cache.set(key, snapshot, settings.cache_ttl_seconds)
+        return snapshot
+
+    async def _get_plan(self, plan_id: int) -> Optional[Dict]:
+        """Get a plan's name and limits, via Redis when cached."""
+        key = PLAN_CACHE_KEY.format(plan_id=plan_id)
+        plan = await redis_cache.get(key)
+        if plan is None:
+            plan_obj = await self.plan_repo.get(plan_id)
+            if not plan_obj:
+                return None
+            plan = {
+                "id": plan_obj.id,
+                "name": plan_obj.name,
+                "max_rooms_per_hostel": plan_obj.max_rooms_per_hostel,
+                "max_tenants_per_hostel": plan_obj.max_tenants_per_hostel,
+            }
+            await redis_cache.set(key, plan, settings.cache_ttl_seconds)
+        return plan
 
-        if current_count >= plan.max_rooms_per_hostel:
-            raise SubscriptionLimitError(
-                f"Room limit reached. Maximum {plan.max_rooms_per_hostel} rooms allowed on {plan.name} plan."
-            )
+    async def _get_subscription_or_auto_create(self, hostel_id: int) -> Optional[Dict]:
+        """
+        Get the hostel's subscription, creating a FREE trial if it has none.
 
-        return True
+        Returns None when there is no subscription and no FREE plan to
+        create one from.
+        """
+        subscription = await self._get_subscription(hostel_id)
+        if subscription:
+            return subscription
 
-    async def check_tenant_limit(self, hostel_id: int) -> bool:
-        """Check if hostel can add more tenants."""
-        subscription = await self.subscription_repo.get_by_hostel(hostel_id)
-        if not subscription:
-            raise NotFoundError("No active subscription")
+        free_plan = await self.plan_repo.get_by_tier(PlanTier.FREE)
+        if not free_plan:
+            return None
 
-        plan = await self.plan_repo.get(subscription.plan_id)
+        from app.models.hostel import SubscriptionStatus
+        from datetime import timedelta
+
+        subscription_data = {
+            "hostel_id": hostel_id,
+            "plan_id": free_plan.id,
+            "status": SubscriptionStatus.TRIAL,
+            "start_date": date.today(),
+            "end_date": date.today() + timedelta(days=365),
+            "auto_renew": False,
+        }
+        created = await self.subscription_repo.create(subscription_data)
+        await self.db.commit()
+        return self._subscription_snapshot(created)
+
+    async def _check_limit(self, hostel_id: int, subscription: Dict, kind: str) -> bool:
+        """
+        Raise SubscriptionLimitError if the hostel is at its plan limit.
+
+        Args:
+            hostel_id: Hostel ID
+            subscription: Subscription snapshot
+            kind: "rooms" or "tenants"
+        """
+        plan = await self._get_plan(subscription["plan_id"])
         if not plan:
             raise NotFoundError("Plan not found")
 
-        # Unlimited tenants
-        if plan.max_tenants_per_hostel is None:
+        limit = plan[f"max_{kind}_per_hostel"]
+
+        # Unlimited
+        if limit is None:
             return True
 
-        # Count current tenants
-        current_count = await self.tenant_repo.count_by_hostel(hostel_id)
+        # Only "count >= limit" matters, so stop scanning at the limit-th row
+        at_limit = limit <= 0 or (
+            await self.db.execute(
+                _AT_LEAST[kind], {"hid": hostel_id, "skip": limit - 1}
+            )
+        ).first() is not None
 
-        if current_count >= plan.max_tenants_per_hostel:
+        if at_limit:
             raise SubscriptionLimitError(
-                f"Tenant limit reached. Maximum {plan.max_tenants_per_hostel} tenants allowed on {plan.name} plan."
+                f"{kind[:-1].capitalize()} limit reached. Maximum {limit} {kind} allowed on {plan['name']} plan."
             )
 
         return True
 
     async def check_room_limit(self, hostel_id: int) -> bool:
         """Check if hostel can add more rooms."""
-        subscription = await self.subscription_repo.get_by_hostel(hostel_id)
+        subscription = await self._get_subscription_or_auto_create(hostel_id)
         if not subscription:
-            raise NotFoundError("No active subscription")
-
-        plan = await self.plan_repo.get(subscription.plan_id)
-        if not plan:
-            raise NotFoundError("Plan not found")
-
-        # Unlimited rooms
-        if plan.max_rooms_per_hostel is None:
+            # No FREE plan exists, allow anyway
             return True
 
-        # Count current rooms (excluding soft-deleted ones)
-        current_count = await self.room_repo.count({
-            "hostel_id": hostel_id,
-            "is_deleted": False
-        })
+        return await self._check_limit(hostel_id, subscription, "rooms")
 
-        if current_count >= plan.max_rooms_per_hostel:
-            raise SubscriptionLimitError(
-                f"Room limit reached. Maximum {plan.max_rooms_per_hostel} rooms allowed on {plan.name} plan."
-            )
+    async def check_tenant_limit(self, hostel_id: int) -> bool:
+        """Check if hostel can add more tenants."""
+        subscription = await self._get_subscription(hostel_id)
+        if not subscription:
+            raise NotFoundError("No active subscription")
 
-        return True
+        return await self._check_limit(hostel_id, subscription, "tenants")
 
     async def get_feature_usage(self, hostel_id: int) -> Dict:
         """Get feature usage statistics."""
-        subscription = await self.subscription_repo.get_by_hostel(hostel_id)
-        if not subscription:
+        # Subscription, plan limits and both usage counts in one round-trip
+        row = (
+            await self.db.execute(_FEATURE_USAGE, {"hid": hostel_id})
+        ).one_or_none()
+        if row is None:
             raise NotFoundError("No active subscription")
-
-        plan = await self.plan_repo.get(subscription.plan_id)
-        if not plan:
+        if row.plan_id is None:
             raise NotFoundError("Plan not found")
 
-        # Count current usage
-        current_tenants = await self.tenant_repo.count_by_hostel(hostel_id)
-        current_rooms = await self.room_repo.count({
-            "hostel_id": hostel_id,
-            "is_deleted": False
-        })
+        plan = {
+            "name": row.name,
+            "max_tenants_per_hostel": row.max_tenants_per_hostel,
+            "max_rooms_per_hostel": row.max_rooms_per_hostel,
+        }
+        current_tenants = row.current_tenants
+        current_rooms = row.current_rooms
 
         # Calculate percentages
         usage_percentage = {}
 
-        if plan.max_tenants_per_hostel:
-            usage_percentage["tenants"] = (current_tenants / plan.max_tenants_per_hostel) * 100
+        if plan["max_tenants_per_hostel"]:
+            usage_percentage["tenants"] = (current_tenants / plan["max_tenants_per_hostel"]) * 100
         else:
             usage_percentage["tenants"] = 0
 
-        if plan.max_rooms_per_hostel:
-            usage_percentage["rooms"] = (current_rooms / plan.max_rooms_per_hostel) * 100
+        if plan["max_rooms_per_hostel"]:
+            usage_percentage["rooms"] = (current_rooms / plan["max_rooms_per_hostel"]) * 100
         else:
             usage_percentage["rooms"] = 0
 
         return {
             "hostel_id": hostel_id,
-            "plan_name": plan.name,
+            "plan_name": plan["name"],
             "current_tenants": current_tenants,
-            "max_tenants": plan.max_tenants_per_hostel,
+            "max_tenants": plan["max_tenants_per_hostel"],
             "current_rooms": current_rooms,
-            "max_rooms": plan.max_rooms_per_hostel,
+            "max_rooms": plan["max_rooms_per_hostel"],
             "usage_percentage": usage_percentage,
         }
 
@@ -201,4 +279,5 @@ class SubscriptionService:
             subscription = await self.subscription_repo.create(subscription_data)
 
         await self.db.commit()
+        await invalidate_subscription_cache(hostel_id)
         return subscription
\ No newline at end of file
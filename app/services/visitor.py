@@ -1,11 +1,13 @@
 """Visitor management service."""
 
-from datetime import datetime, timedelta
+import asyncio
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from sqlalchemy import Row, func, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.user import User, UserRole
+from app.models.user import User, UserRole, Visitor
 from app.repositories.user import UserRepository
 from app.repositories.hostel import HostelRepository
 from app.exceptions import (
@@ -73,10 +75,11 @@ class VisitorService:
         if not password:
             password = generate_otp(8)  # 8-digit temporary password
 
-        password_hash = hash_password(password)
+        # Hashing is CPU-bound; keep it off the event loop
+        password_hash = await asyncio.to_thread(hash_password, password)
 
         # Calculate expiration time
-        expires_at = datetime.utcnow() + timedelta(days=duration_days)
+        expires_at = datetime.now(timezone.utc) + timedelta(days=duration_days)
 
         # Create visitor user
         user_data = {
@@ -91,9 +94,8 @@ class VisitorService:
         }
 
         user = await self.user_repo.create(user_data)
-        await self.db.commit()
 
-        # Log the visitor creation
+        # Log the visitor creation in the same transaction
         from app.models.audit import AuditLog, AuditAction
         from app.repositories.audit import AuditLogRepository
         
@@ -108,7 +110,7 @@ class VisitorService:
                 "role": "VISITOR",
                 "email": email,
                 "phone": phone,
-                "expires_at": expires_at.isoformat(),
+                "expires_at": expires_at,
             },
         })
         await self.db.commit()
@@ -141,11 +143,12 @@ class VisitorService:
             raise ValidationError("User is not a visitor")
 
         # Calculate new expiration
-        current_expiration = user.visitor_expires_at or datetime.utcnow()
+        now = datetime.now(timezone.utc)
+        current_expiration = user.visitor_expires_at or now
         
         # If already expired, extend from now
-        if current_expiration < datetime.utcnow():
-            new_expiration = datetime.utcnow() + timedelta(days=additional_days)
+        if current_expiration < now:
+            new_expiration = now + timedelta(days=additional_days)
         else:
             new_expiration = current_expiration + timedelta(days=additional_days)
 
@@ -154,9 +157,8 @@ class VisitorService:
             visitor_id,
             {"visitor_expires_at": new_expiration}
         )
-        await self.db.commit()
 
-        # Log the extension
+        # Log the extension in the same transaction
         from app.models.audit import AuditLog, AuditAction
         from app.repositories.audit import AuditLogRepository
         
@@ -167,8 +169,8 @@ class VisitorService:
             "entity_type": "User",
             "entity_id": visitor_id,
             "action": AuditAction.UPDATE,
-            "old_values": {"expires_at": current_expiration.isoformat()},
-            "new_values": {"expires_at": new_expiration.isoformat()},
+            "old_values": {"expires_at": current_expiration},
+            "new_values": {"expires_at": new_expiration},
         })
         await self.db.commit()
 
@@ -189,32 +191,40 @@ class VisitorService:
         Returns:
             Updated visitor user
         """
-        user = await self.user_repo.get(visitor_id)
+        # Check the role and deactivate the account in one atomic statement
+        result = await self.db.scalars(
+            update(User)
+            .where(
+                User.id == visitor_id,
+                User.role == UserRole.VISITOR,
+                User.is_deleted == False,
+            )
+            .values(is_active=False)
+            .returning(User)
+        )
+        user = result.one_or_none()
         
         if not user:
             raise NotFoundError("Visitor not found")
-        
-        if user.role != UserRole.VISITOR:
-            raise ValidationError("User is not a visitor")
 
-        # Set expiration to now
-        user = await self.user_repo.update(
-            visitor_id,
-            {
-                "visitor_expires_at": datetime.utcnow(),
-                "is_active": False,
-            }
-        )
-        await self.db.commit()
+        # Expire the visitor row; its hostel scopes the audit entry
+        hostel_id = (
+            await self.db.execute(
+                update(Visitor)
+                .where(Visitor.user_id == visitor_id)
+                .values(visitor_expires_at=datetime.now(timezone.utc))
+                .returning(Visitor.hostel_id)
+            )
+        ).scalar_one_or_none()
 
-        # Log the revocation
+        # Log the revocation in the same transaction
         from app.models.audit import AuditLog, AuditAction
         from app.repositories.audit import AuditLogRepository
         
         audit_repo = AuditLogRepository(AuditLog, self.db)
         await audit_repo.create({
             "user_id": revoked_by_admin_id,
-            "hostel_id": user.primary_hostel_id,
+            "hostel_id": hostel_id,
             "entity_type": "User",
             "entity_id": visitor_id,
             "action": AuditAction.UPDATE,
@@ -227,24 +237,30 @@ class VisitorService:
 
         return user
 
-    async def get_active_visitors(self, hostel_id: int) -> list[User]:
-        """Get all active visitors for a hostel."""
-        filters = {
-            "role": UserRole.VISITOR,
-            "primary_hostel_id": hostel_id,
-            "is_active": True,
-            "is_deleted": False,
-        }
-        
-        visitors = await self.user_repo.get_multi(filters=filters)
+    async def get_active_visitors(self, hostel_id: int) -> list[Row]:
+        """
+        Get all active visitors for a hostel.
         
-        # Filter out expired visitors
-        active_visitors = [
-            v for v in visitors 
-            if not v.is_visitor_expired()
-        ]
+        Returns:
+            Rows of (id, visitor_expires_at, hostel_id)
+        """
+        result = await self.db.execute(
+            select(User.id, Visitor.visitor_expires_at, Visitor.hostel_id)
+            .join(Visitor, Visitor.user_id == User.id)
+            .where(
+                User.role == UserRole.VISITOR,
+                Visitor.hostel_id == hostel_id,
+                User.is_active == True,
+                User.is_deleted == False,
+                # Expiry is checked in SQL so expired rows are never fetched
+                or_(
+                    Visitor.visitor_expires_at.is_(None),
+                    Visitor.visitor_expires_at > func.now(),
+                ),
+            )
+        )
         
-        return active_visitors
+        return list(result.all())
 
     async def cleanup_expired_visitors(self) -> int:
         """
@@ -253,24 +269,42 @@ class VisitorService:
         Returns:
             Number of accounts deactivated
         """
-        filters = {
-            "role": UserRole.VISITOR,
-            "is_active": True,
-            "is_deleted": False,
-        }
-        
-        visitors = await self.user_repo.get_multi(filters=filters, limit=1000)
-        
-        deactivated_count = 0
-        for visitor in visitors:
-            if visitor.is_visitor_expired():
-                await self.user_repo.update(
-                    visitor.id,
-                    {"is_active": False}
-                )
-                deactivated_count += 1
-        
-        if deactivated_count > 0:
-            await self.db.commit()
+        from app.models.audit import AuditLog, AuditAction
+
+        # Single set-based UPDATE ... FROM visitors; the expiry check runs
+        # in SQL against the visitor row
+        stmt = (
+            update(User)
+            .where(
+                User.id == Visitor.user_id,
+                User.role == UserRole.VISITOR,
+                User.is_active == True,
+                User.is_deleted == False,
+                Visitor.visitor_expires_at < datetime.now(timezone.utc),
+            )
+            .values(is_active=False)
+            .returning(User.id, Visitor.hostel_id)
+            .execution_options(synchronize_session=False)
+        )
+        deactivated = (await self.db.execute(stmt)).all()
+
+        # One audit row per deactivated visitor, sent as a single executemany
+        if deactivated:
+            await self.db.execute(
+                insert(AuditLog),
+                [
+                    {
+                        "user_id": None,
+                        "hostel_id": hostel_id,
+                        "entity_type": "User",
+                        "entity_id": user_id,
+                        "action": AuditAction.UPDATE,
+                        "new_values": {"status": "expired", "is_active": False},
+                    }
+                    for user_id, hostel_id in deactivated
+                ],
+            )
+
+        await self.db.commit()
         
-        return deactivated_count
\ No newline at end of file
+        return len(deactivated)
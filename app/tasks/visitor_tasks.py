@@ -1,15 +1,30 @@
 """Background tasks for visitor management."""
 
 import asyncio
-from datetime import datetime
+from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import redis_cache
 from app.database import AsyncSessionLocal
 from app.services.visitor import VisitorService
 from app.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Upper bound on in-flight expiry notifications (matches the DB pool size)
+NOTIFICATION_CONCURRENCY = 20
+
+# Upper bound on visitors notified per run, soonest expiry first
+EXPIRY_NOTIFICATION_BATCH = 5000
+
+# Rows fetched per round-trip while streaming expiring visitors
+EXPIRY_STREAM_PARTITION = 500
+
+# Cross-instance locks so only one worker runs each scheduled batch
+CLEANUP_LOCK_KEY = "visitor:cleanup_lock"
+NOTIFICATION_LOCK_KEY = "visitor:notification_lock"
+SCHEDULED_LOCK_TTL_SECONDS = 7200
+
 
 async def cleanup_expired_visitors_task():
     """
@@ -57,55 +72,74 @@ async def notify_expiring_visitors_task(days_before: int = 7):
         try:
             from datetime import timedelta
             from sqlalchemy import select
-            from app.models.user import User, UserRole
+            from app.models.user import User, UserRole, Visitor
             from app.services.notification import NotificationService
             
             # Get visitors expiring soon
-            expiring_date = datetime.utcnow() + timedelta(days=days_before)
+            now = datetime.now(timezone.utc)
+            expiring_date = now + timedelta(days=days_before)
             
-            result = await db.execute(
-                select(User).where(
+            # Stream rows in partitions so sends start before the whole
+            # cohort is fetched and memory stays bounded
+            result = await db.stream(
+                select(User.id, Visitor.visitor_expires_at)
+                .join(Visitor, Visitor.user_id == User.id)
+                .where(
                     User.role == UserRole.VISITOR,
                     User.is_active == True,
-                    User.visitor_expires_at <= expiring_date,
-                    User.visitor_expires_at > datetime.utcnow(),
+                    Visitor.visitor_expires_at <= expiring_date,
+                    Visitor.visitor_expires_at > now,
                 )
+                .order_by(Visitor.visitor_expires_at)
+                .limit(EXPIRY_NOTIFICATION_BATCH)
+                .execution_options(yield_per=EXPIRY_STREAM_PARTITION)
             )
             
-            expiring_visitors = result.scalars().all()
+            # Send notifications concurrently, bounded so we never hold more
+            # sessions than the connection pool can hand out. Each send gets
+            # its own session since an AsyncSession is not safe to share
+            # between concurrent tasks.
+            semaphore = asyncio.Semaphore(NOTIFICATION_CONCURRENCY)
             
-            # Send notifications
-            notification_service = NotificationService(db)
-            sent_count = 0
+            async def notify(visitor) -> int:
+                async with semaphore:
+                    try:
+                        async with AsyncSessionLocal() as send_db:
+                            notification_service = NotificationService(send_db)
+                            await notification_service.send_notification(
+                                user_id=visitor["id"],
+                                title="Visitor Account Expiring Soon",
+                                message=(
+                                    f"Your visitor account will expire on "
+                                    f"{visitor['visitor_expires_at'].strftime('%Y-%m-%d %H:%M')}. "
+                                    f"Please contact the administrator if you need extended access."
+                                ),
+                                notification_type="WARNING",
+                            )
+                            await send_db.commit()
+                        return 1
+                    except Exception as e:
+                        logger.error(
+                            f"Failed to send notification to visitor {visitor['id']}: {str(e)}"
+                        )
+                        return 0
             
-            for visitor in expiring_visitors:
-                try:
-                    await notification_service.send_notification(
-                        user_id=visitor.id,
-                        title="Visitor Account Expiring Soon",
-                        message=(
-                            f"Your visitor account will expire on "
-                            f"{visitor.visitor_expires_at.strftime('%Y-%m-%d %H:%M')}. "
-                            f"Please contact the administrator if you need extended access."
-                        ),
-                        notification_type="WARNING",
-                    )
-                    sent_count += 1
-                except Exception as e:
-                    logger.error(
-                        f"Failed to send notification to visitor {visitor.id}: {str(e)}"
-                    )
-            
-            await db.commit()
+            visitors_count = 0
+            sent_count = 0
+            async for partition in result.mappings().partitions():
+                visitors_count += len(partition)
+                sent_count += sum(
+                    await asyncio.gather(*(notify(v) for v in partition))
+                )
             
             logger.info(
                 f"Expiration notification task completed. "
-                f"Sent {sent_count} notifications to {len(expiring_visitors)} visitors."
+                f"Sent {sent_count} notifications to {visitors_count} visitors."
             )
             
             return {
                 "success": True,
-                "visitors_count": len(expiring_visitors),
+                "visitors_count": visitors_count,
                 "notifications_sent": sent_count,
                 "timestamp": datetime.utcnow().isoformat(),
             }
@@ -119,6 +153,31 @@ async def notify_expiring_visitors_task(days_before: int = 7):
             }
 
 
+async def _run_exclusive(lock_key: str, job, **kwargs):
+    """Run a scheduled job unless another app instance already holds its lock."""
+    token = await redis_cache.acquire_lock(lock_key, SCHEDULED_LOCK_TTL_SECONDS)
+    if token is None:
+        logger.info(f"{job.__name__} already running elsewhere, skipping")
+        return {"skipped": True}
+    
+    try:
+        return await job(**kwargs)
+    finally:
+        await redis_cache.release_lock(lock_key, token)
+
+
+async def scheduled_cleanup_task():
+    """Nightly cleanup, run by a single app instance."""
+    return await _run_exclusive(CLEANUP_LOCK_KEY, cleanup_expired_visitors_task)
+
+
+async def scheduled_notification_task(days_before: int = 7):
+    """Morning expiry notifications, run by a single app instance."""
+    return await _run_exclusive(
+        NOTIFICATION_LOCK_KEY, notify_expiring_visitors_task, days_before=days_before
+    )
+
+
 # ===== SCHEDULER INTEGRATION =====
 
 def schedule_visitor_tasks():
@@ -133,23 +192,28 @@ def schedule_visitor_tasks():
     
     scheduler = AsyncIOScheduler()
     
+    # Never stack runs; a late or missed tick runs once within the hour
+    run_once = dict(coalesce=True, max_instances=1, misfire_grace_time=3600)
+    
     # Cleanup expired visitors daily at 2 AM
     scheduler.add_job(
-        cleanup_expired_visitors_task,
+        scheduled_cleanup_task,
         trigger=CronTrigger(hour=2, minute=0),
         id="visitor_cleanup",
         name="Cleanup expired visitor accounts",
         replace_existing=True,
+        **run_once,
     )
     
     # Notify expiring visitors daily at 9 AM
     scheduler.add_job(
-        notify_expiring_visitors_task,
+        scheduled_notification_task,
         trigger=CronTrigger(hour=9, minute=0),
         id="visitor_expiry_notification",
         name="Notify visitors about expiring accounts",
         replace_existing=True,
         kwargs={"days_before": 7},
+        **run_once,
     )
     
     scheduler.start()
@@ -0,0 +1,35 @@
+# scripts/_db.py
+"""Database sessions for the maintenance scripts.
+
+Kept out of app.database so API workers don't build a pool they never use.
+"""
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.config import settings
+
+# Skip Postgres JIT, as the app engine does for asyncpg connections
+_connect_args = {}
+if "asyncpg" in str(settings.database_url):
+    _connect_args["server_settings"] = {"jit": "off"}
+
+# Script sessions always end with an explicit commit or rollback, so skip
+# the pool's reset-on-return rollback
+script_engine = create_async_engine(
+    str(settings.database_url),
+    echo=settings.debug,
+    pool_pre_ping=True,
+    pool_reset_on_return=None,
+    connect_args=_connect_args,
+    json_serializer=lambda value: orjson.dumps(value).decode(),
+    json_deserializer=orjson.loads,
+)
+
+ScriptSessionLocal = async_sessionmaker(
+    script_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
@@ -1,5 +1,6 @@
 """Create a super admin user."""
 
+import asyncio
 import sys
 from pathlib import Path
 
@@ -7,6 +8,8 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from sqlalchemy.dialects.postgresql import insert
+
 from app.database import AsyncSessionLocal
 from app.models.user import User, UserRole
 from app.core.security import hash_password
@@ -16,40 +19,41 @@ setup_logging()
 logger = get_logger(__name__)
 
 
-def create_superadmin(email: str, password: str):
+async def create_superadmin(email: str, password: str) -> bool:
     """Create a super admin user."""
-    db = AsyncSessionLocal()
-    try:
-        # Check if user exists
-        existing = db.query(User).filter(User.email == email).first()
-
-        if existing:
-            logger.error(f"❌ User with email {email} already exists")
-            return False
+    async with AsyncSessionLocal() as db:
+        try:
+            # Insert unless the email is taken, in a single round-trip
+            stmt = (
+                insert(User)
+                .values(
+                    email=email,
+                    password_hash=hash_password(password),
+                    role=UserRole.SUPER_ADMIN,
+                    is_active=True,
+                    is_verified=True,
+                )
+                .on_conflict_do_nothing(index_elements=["email"])
+                .returning(User.id)
+            )
+            result = await db.execute(stmt)
+            created = result.first()
+            await db.commit()
 
-        # Create super admin
-        admin = User(
-            email=email,
-            password_hash=hash_password(password),
-            role=UserRole.SUPER_ADMIN,
-            is_active=True,
-            is_verified=True,
-        )
-        db.add(admin)
-        db.commit()
+            if created is None:
+                logger.error(f"❌ User with email {email} already exists")
+                return False
 
-        logger.info(f"✅ Super admin created successfully!")
-        logger.info(f"   Email: {email}")
-        logger.info(f"   Password: {password}")
+            logger.info(f"✅ Super admin created successfully!")
+            logger.info(f"   Email: {email}")
+            logger.info(f"   Password: {password}")
 
-        return True
+            return True
 
-    except Exception as e:
-        logger.error(f"❌ Error creating super admin: {e}")
-        db.rollback()
-        return False
-    finally:
-        db.close()
+        except Exception as e:
+            logger.error(f"❌ Error creating super admin: {e}")
+            await db.rollback()
+            return False
 
 
 if __name__ == "__main__":
@@ -60,5 +64,5 @@ if __name__ == "__main__":
     email = sys.argv[1]
     password = sys.argv[2]
 
-    success = create_superadmin(email, password)
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    success = asyncio.run(create_superadmin(email, password))
+    sys.exit(0 if success else 1)
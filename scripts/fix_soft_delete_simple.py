@@ -3,13 +3,17 @@
 
 import sys
 import asyncio
+from collections import defaultdict
 from pathlib import Path
 
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from sqlalchemy import text
-from app.database import AsyncSessionLocal
+from app.database import AsyncSessionLocal, engine
+
+# Tables queried per hostel for live rows; matches the model partial indexes
+ACTIVE_INDEXED_TABLES = ('rooms', 'beds', 'tenant_profiles')
 
 
 async def fix_database():
@@ -21,72 +25,104 @@ async def fix_database():
         try:
             tables = ['hostels', 'rooms', 'beds', 'tenant_profiles', 'users']
             
+            # Fetch every existing soft delete column in one catalog query
+            check_query = text("""
+                SELECT c.relname, a.attname
+                FROM pg_attribute a
+                JOIN pg_class c ON a.attrelid = c.oid
+                WHERE c.relname = ANY(:tables)
+                AND c.relnamespace = current_schema()::regnamespace
+                AND c.relkind = 'r'
+                AND a.attname IN ('is_deleted', 'deleted_at')
+                AND NOT a.attisdropped
+            """)
+            
+            result = await db.execute(check_query, {"tables": tables})
+            have = set(result.fetchall())
+            
+            # Collect the missing columns, one ALTER per table, then run
+            # them all as one DO block
+            statements = []
             for table in tables:
                 print(f"\n📋 Processing table: {table}")
                 
-                # Check if is_deleted exists
-                check_query = text(f"""
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name = '{table}' 
-                    AND column_name IN ('is_deleted', 'deleted_at')
-                """)
-                
-                result = await db.execute(check_query)
-                existing_columns = [row[0] for row in result.fetchall()]
-                
-                # Add is_deleted if missing
-                if 'is_deleted' not in existing_columns:
+                missing = []
+                if (table, 'is_deleted') not in have:
                     print(f"   ➕ Adding is_deleted column...")
-                    await db.execute(text(f"""
-                        ALTER TABLE {table} 
-                        ADD COLUMN is_deleted BOOLEAN NOT NULL DEFAULT FALSE
-                    """))
-                    print(f"   ✅ Added is_deleted")
+                    missing.append("is_deleted BOOLEAN NOT NULL DEFAULT FALSE")
                 else:
                     print(f"   ✅ is_deleted already exists")
                 
-                # Add deleted_at if missing
-                if 'deleted_at' not in existing_columns:
+                if (table, 'deleted_at') not in have:
                     print(f"   ➕ Adding deleted_at column...")
-                    await db.execute(text(f"""
-                        ALTER TABLE {table} 
-                        ADD COLUMN deleted_at TIMESTAMP WITH TIME ZONE
-                    """))
-                    print(f"   ✅ Added deleted_at")
+                    missing.append("deleted_at TIMESTAMP WITH TIME ZONE")
                 else:
                     print(f"   ✅ deleted_at already exists")
                 
-                # Create index for performance
-                print(f"   ➕ Creating index...")
-                await db.execute(text(f"""
-                    CREATE INDEX IF NOT EXISTS idx_{table}_is_deleted 
-                    ON {table}(is_deleted)
-                """))
-                print(f"   ✅ Index created")
+                if missing:
+                    # Both columns in one statement: a single lock acquisition
+                    statements.append(
+                        f"ALTER TABLE {table} "
+                        + ", ".join(f"ADD COLUMN IF NOT EXISTS {c}" for c in missing)
+                        + ";"
+                    )
             
+            if statements:
+                print(f"\n➕ Applying {len(statements)} ALTER statements...")
+                await db.execute(
+                    text("DO $$ BEGIN\n" + "\n".join(statements) + "\nEND $$")
+                )
             await db.commit()
             
+            # CONCURRENTLY can't run inside a transaction, so build the
+            # indexes on an autocommit connection without blocking writers
+            print("\n➕ Creating indexes...")
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                for table in tables:
+                    # Partial index over the deleted minority only; live-row
+                    # writes pay no index maintenance
+                    await conn.execute(text(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_{table}_deleted "
+                        f"ON {table}(id) WHERE is_deleted = true"
+                    ))
+                # And the live majority by hostel, for the hot
+                # "hostel_id = ? AND is_deleted = false" lookups
+                for table in ACTIVE_INDEXED_TABLES:
+                    await conn.execute(text(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_{table}_hostel_active "
+                        f"ON {table}(hostel_id) WHERE is_deleted = false"
+                    ))
+            print("   ✅ Indexes created")
+            
             print("\n" + "=" * 60)
             print("✅ ALL TABLES FIXED SUCCESSFULLY!")
             print("=" * 60)
             
             # Verify the fix
             print("\n🔍 VERIFICATION:")
+            verify_query = text("""
+                SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod)
+                FROM pg_attribute a
+                JOIN pg_class c ON a.attrelid = c.oid
+                WHERE c.relname = ANY(:tables)
+                AND c.relnamespace = current_schema()::regnamespace
+                AND c.relkind = 'r'
+                AND a.attname IN ('is_deleted', 'deleted_at')
+                AND NOT a.attisdropped
+                ORDER BY c.relname, a.attname
+            """)
+            
+            result = await db.execute(verify_query, {"tables": tables})
+            columns_by_table = defaultdict(list)
+            for table, column_name, data_type in result.fetchall():
+                columns_by_table[table].append((column_name, data_type))
+            
             for table in tables:
-                verify_query = text(f"""
-                    SELECT column_name, data_type 
-                    FROM information_schema.columns 
-                    WHERE table_name = '{table}' 
-                    AND column_name IN ('is_deleted', 'deleted_at')
-                    ORDER BY column_name
-                """)
-                
-                result = await db.execute(verify_query)
-                columns = result.fetchall()
+                columns = columns_by_table[table]
                 
                 if len(columns) == 2:
-                    print(f"   ✅ {table}: {columns[0][0]} ({columns[0][1]}), {columns[1][0]} ({columns[1][1]})")
+                    print(f"   ✅ {table}: " + ", ".join(f"{name} ({data_type})" for name, data_type in columns))
                 else:
                     print(f"   ❌ {table}: MISSING COLUMNS!")
             
@@ -1,4 +1,4 @@
-"""Force reset database by dropping and recreating it."""
+"""Force reset database by dropping and recreating its schema."""
 
 import sys
 import asyncio
@@ -16,47 +16,31 @@ from app.models import *  # Import all models at module level
 
 
 async def force_reset_database():
-    """Force reset by dropping and recreating the database."""
+    """Force reset by dropping and recreating the public schema."""
     
-    # Parse connection string to get database name and base URL
     db_url = str(settings.database_url)
     db_name = db_url.split('/')[-1]
-    base_url = db_url.rsplit('/', 1)[0]
     
     print(f"\n🗑️  Force resetting database: {db_name}")
     
-    # Connect to postgres database (not our app database)
-    postgres_url = f"{base_url}/postgres"
-    engine = create_async_engine(postgres_url, isolation_level="AUTOCOMMIT")
+    # Reset the schema in place: same database, one engine, one transaction,
+    # and no need to terminate other backends
+    engine = create_async_engine(db_url, echo=False)
     
-    async with engine.connect() as conn:
-        # Terminate existing connections
-        print("   Terminating existing connections...")
-        await conn.execute(text(f"""
-            SELECT pg_terminate_backend(pg_stat_activity.pid)
-            FROM pg_stat_activity
-            WHERE pg_stat_activity.datname = '{db_name}'
-            AND pid <> pg_backend_pid();
-        """))
+    async with engine.begin() as conn:
+        print("   Dropping schema public...")
+        await conn.execute(text("DROP SCHEMA public CASCADE"))
         
-        # Drop database
-        print(f"   Dropping database {db_name}...")
-        await conn.execute(text(f'DROP DATABASE IF EXISTS "{db_name}"'))
+        print("   Creating schema public...")
+        await conn.execute(text("CREATE SCHEMA public"))
         
-        # Create database
-        print(f"   Creating database {db_name}...")
-        await conn.execute(text(f'CREATE DATABASE "{db_name}"'))
-    
-    await engine.dispose()
-    
-    # Now create tables using SQLAlchemy
-    print("\n✨ Creating tables...")
-    
-    app_engine = create_async_engine(db_url, echo=False)
-    async with app_engine.begin() as conn:
+        # Skip the WAL flush wait on commit; safe for a throwaway dev reset
+        await conn.execute(text("SET LOCAL synchronous_commit = off"))
+        
+        print("\n✨ Creating tables...")
         await conn.run_sync(Base.metadata.create_all)
     
-    await app_engine.dispose()
+    await engine.dispose()
     
     print("\n✅ Database reset complete!")
     print(f"\nNext step:")
@@ -0,0 +1,23 @@
+# scripts/run_soft_delete_checks.py
+"""Run the soft delete test and verification scripts concurrently."""
+
+import sys
+import asyncio
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.test_soft_delete import test_soft_delete
+from scripts.verify_soft_delete import verify_soft_delete
+
+
+async def run_all() -> bool:
+    """Run both checks at once; each opens its own session on the script pool."""
+    results = await asyncio.gather(test_soft_delete(), verify_soft_delete())
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all())
+    sys.exit(0 if success else 1)
@@ -9,14 +9,23 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 import asyncio
+import functools
+import traceback
 from datetime import date, timedelta
 
 from app.database import AsyncSessionLocal, engine, Base
 from app.models.user import User, UserRole
 from app.models.hostel import Plan, PlanTier, Hostel, Subscription, SubscriptionStatus
+from app.models.tenant import TenantProfile
+from app.models.associations import user_hostel_association
 from app.core.security import hash_password
+from sqlalchemy import exists, insert, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# Seed-only memoization: demo accounts share a few known plaintexts, so
+# identical passwords skip repeated bcrypt work. Never do this in app code.
+_hash_seed_password = functools.lru_cache(maxsize=8)(hash_password)
+
 
 async def seed_plans(session: AsyncSession):
     """Seed subscription plans."""
@@ -78,10 +87,8 @@ async def seed_plans(session: AsyncSession):
         },
     ]
 
-    for plan_data in plans_data:
-        plan = Plan(**plan_data)
-        session.add(plan)
-    
+    # Single executemany INSERT instead of one ORM add per plan
+    await session.execute(insert(Plan), plans_data)
     await session.commit()
     print("✓ Seeded subscription plans")
 
@@ -91,7 +98,7 @@ async def seed_superadmin(session: AsyncSession):
     superadmin = User(
         email="superadmin@hostelms.com",
         phone="+919999999999",
-        password_hash=hash_password("SuperAdmin@123"),
+        password_hash=_hash_seed_password("SuperAdmin@123"),
         role=UserRole.SUPER_ADMIN,
         is_active=True,
         is_verified=True,
@@ -106,8 +113,6 @@ async def seed_superadmin(session: AsyncSession):
 
 async def seed_demo_hostel_with_admin(session: AsyncSession):
     """Seed demo hostel with admin."""
-    from sqlalchemy import select
-    
     # Get the FREE plan
     result = await session.execute(select(Plan).where(Plan.tier == PlanTier.FREE))
     free_plan = result.scalar_one()
@@ -137,31 +142,25 @@ async def seed_demo_hostel_with_admin(session: AsyncSession):
         end_date=date.today() + timedelta(days=30),
         auto_renew=False,
     )
-    session.add(subscription)
 
     # Create hostel admin
     admin = User(
         email="admin@demo.com",
         phone="+919876543211",
-        password_hash=hash_password("Admin@123"),
+        password_hash=_hash_seed_password("Admin@123"),
         role=UserRole.HOSTEL_ADMIN,
         primary_hostel_id=demo_hostel.id,
         is_active=True,
         is_verified=True,
     )
-    session.add(admin)
+    # Subscription and admin go out in one flush
+    session.add_all([subscription, admin])
     await session.flush()
 
     # Associate admin with hostel (manual insert to avoid lazy loading in async)
-    from sqlalchemy import insert
-    from app.models.associations import user_hostel_association
-    
-    await session.execute(
-        insert(user_hostel_association).values(
-            user_id=admin.id,
-            hostel_id=demo_hostel.id
-        )
-    )
+    # executemany: one prepared statement however many admins are linked
+    pairs = [{"user_id": admin.id, "hostel_id": demo_hostel.id}]
+    await session.execute(insert(user_hostel_association), pairs)
 
     await session.commit()
     print("✓ Seeded demo hostel with admin")
@@ -178,14 +177,11 @@ async def seed_demo_tenant_with_profile(session: AsyncSession, hostel: Hostel):
     ✅ UPDATED: Automatically creates TenantProfile when creating TENANT user,
     matching the behavior in AuthService.register_user()
     """
-    from app.models.tenant import TenantProfile
-    from datetime import date
-    
     # Create tenant user
     tenant_user = User(
         email="tenant@demo.com",
         phone="+919876543212",
-        password_hash=hash_password("Tenant@123"),
+        password_hash=_hash_seed_password("Tenant@123"),
         role=UserRole.TENANT,
         primary_hostel_id=hostel.id,
         is_active=True,
@@ -225,35 +221,106 @@ async def seed_demo_tenant_with_profile(session: AsyncSession, hostel: Hostel):
     return tenant_user, tenant_profile
 
 
+async def bulk_create_tenants(session: AsyncSession, hostel: Hostel, rows: list[dict]):
+    """
+    Bulk-create tenant users with profiles for a hostel.
+    
+    Users are loaded with COPY, which skips per-row parse/plan, and the
+    matching profiles are created with one INSERT ... SELECT.
+    
+    Args:
+        session: Active session; the caller commits
+        hostel: Hostel the tenants belong to
+        rows: Dicts with email, phone, password and full_name
+    """
+    if not rows:
+        return 0
+
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        "users",
+        records=[
+            (
+                row["email"],
+                row["phone"],
+                _hash_seed_password(row["password"]),
+                UserRole.TENANT.value,
+                True,
+                True,
+                False,
+            )
+            for row in rows
+        ],
+        columns=[
+            "email", "phone", "password_hash", "role",
+            "is_active", "is_verified", "is_deleted",
+        ],
+    )
+
+    result = await session.execute(
+        text("""
+            INSERT INTO tenant_profiles (user_id, hostel_id, full_name, is_deleted)
+            SELECT u.id, :hostel_id, r.full_name, false
+            FROM unnest(CAST(:emails AS text[]), CAST(:names AS text[])) 
+                AS r(email, full_name)
+            JOIN users u ON u.email = r.email
+        """),
+        {
+            "hostel_id": hostel.id,
+            "emails": [row["email"] for row in rows],
+            "names": [row["full_name"] for row in rows],
+        },
+    )
+    return result.rowcount
+
+
 async def seed_all():
     """Seed all initial data."""
     print("\n🌱 Starting database seeding...\n")
 
-    # Create tables if they don't exist
+    # Create tables only on an empty database; one regclass lookup
+    # replaces create_all's per-table existence checks
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        users_table = (
+            await conn.execute(text("SELECT to_regclass('users')"))
+        ).scalar()
+        if users_table is None:
+            await conn.run_sync(Base.metadata.create_all)
     print("✓ Database tables verified\n")
 
     async with AsyncSessionLocal() as session:
         try:
-            from sqlalchemy import select
-            
-            # Check if plans already exist
-            result = await session.execute(select(Plan))
-            existing_plans = result.scalars().all()
+            # Check all seeding preconditions in one round-trip
+            preconditions = (
+                await session.execute(
+                    select(
+                        exists().select_from(Plan).label("has_plans"),
+                        exists()
+                        .where(User.role == UserRole.SUPER_ADMIN)
+                        .label("has_superadmin"),
+                        exists()
+                        .where(Hostel.code == "DEMO001")
+                        .label("has_demo_hostel"),
+                    )
+                )
+            ).one()
             
-            if not existing_plans:
+            if not preconditions.has_plans:
                 # Seed plans only if they don't exist
                 await seed_plans(session)
             else:
                 print("⚠️  Plans already exist. Skipping plan seeding.")
             
             # Check if superadmin already exists
-            result = await session.execute(select(User).where(User.role == UserRole.SUPER_ADMIN))
-            if result.scalar_one_or_none():
+            if preconditions.has_superadmin:
                 print("⚠️  Super admin already exists. Skipping user seeding.\n")
                 return
 
+            if preconditions.has_demo_hostel:
+                print("⚠️  Demo hostel DEMO001 already exists. Skipping user seeding.\n")
+                return
+
             # Seed superadmin
             await seed_superadmin(session)
 
@@ -287,7 +354,6 @@ async def seed_all():
 
         except Exception as e:
             print(f"\n❌ Error during seeding: {e}")
-            import traceback
             traceback.print_exc()
             await session.rollback()
             raise
@@ -26,9 +26,11 @@ async def create_super_admin():
         # Check if super admin exists
         from sqlalchemy import select
         result = await session.execute(
-            select(User).where(User.role == UserRole.SUPER_ADMIN)
+            select(User.email, User.phone)
+            .where(User.role == UserRole.SUPER_ADMIN)
+            .limit(1)
         )
-        existing = result.scalar_one_or_none()
+        existing = result.first()
         
         if existing:
             print(f"✅ Super Admin already exists: {existing.email or existing.phone}")
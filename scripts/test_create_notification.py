@@ -7,46 +7,49 @@ sys.path.insert(0, str(project_root))
 
 from app.database import AsyncSessionLocal
 from app.models.notification import Notification, NotificationType
+from app.models.tenant import TenantProfile
 from app.models.user import User
-from sqlalchemy import select
+from sqlalchemy import insert, literal, select
 
 
 async def create_test_notification():
     """Create test notification for debugging."""
     async with AsyncSessionLocal() as db:
-        # Get tenant user
+        # Insert straight from the tenant's user and profile rows, in one
+        # round-trip; the hostel comes from the tenant profile
+        source = select(
+            User.id,
+            TenantProfile.hostel_id,
+            literal("Test Notification"),
+            literal("This is a test notification to verify the system is working!"),
+            literal(NotificationType.INFO, Notification.notification_type.type),
+            literal(False),
+        ).join(
+            TenantProfile, TenantProfile.user_id == User.id
+        ).where(User.email == "tenant@demo.com")
+        
         result = await db.execute(
-            select(User).where(User.email == "tenant@demo.com")
+            insert(Notification)
+            .from_select(
+                ["user_id", "hostel_id", "title", "message", "notification_type", "is_read"],
+                source,
+            )
+            .returning(Notification.id)
         )
-        user = result.scalar_one_or_none()
+        notification_id = result.scalar()
+        await db.commit()
         
-        if not user:
+        if notification_id is None:
             print("❌ User not found!")
             return
         
-        print(f"✅ Found user: {user.email} (ID: {user.id})")
-        
-        # Create test notification
-        notification = Notification(
-            user_id=user.id,
-            hostel_id=user.primary_hostel_id,
-            title="Test Notification",
-            message="This is a test notification to verify the system is working!",
-            notification_type=NotificationType.INFO,
-            is_read=False
-        )
-        
-        db.add(notification)
-        await db.commit()
-        await db.refresh(notification)
-        
-        print(f"✅ Created notification ID: {notification.id}")
+        print(f"✅ Created notification ID: {notification_id}")
         print(f"\nNow test in Swagger:")
         print(f"1. Login as tenant@demo.com")
         print(f"2. GET /api/v1/notifications")
         print(f"3. You should see the test notification!")
         
-        return notification
+        return notification_id
 
 
 if __name__ == "__main__":
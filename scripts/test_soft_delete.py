@@ -2,188 +2,251 @@
 """Test if soft delete is actually working in your database."""
 
 import sys
+import json
 import asyncio
+import traceback
+import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from sqlalchemy import text
-from app.database import AsyncSessionLocal
+from scripts._db import ScriptSessionLocal
 
+TEST_HOSTEL_ID = 1
+# Unique per run so concurrent runs never contend on the room number index
+TEST_ROOM_NUMBER = f"TEST_SOFT_DELETE_{uuid.uuid4().hex[:8]}"
 
-async def test_soft_delete():
-    """Test soft delete end-to-end."""
-    print("\n🧪 TESTING SOFT DELETE FUNCTIONALITY\n")
-    print("=" * 60)
+# The whole soft delete round trip as one server-side block. DO blocks take
+# no bind parameters, so the inputs arrive through transaction-local settings
+# bound by SOFT_DELETE_TEST_PARAMS; the block text itself stays constant.
+SOFT_DELETE_TEST_PARAMS = text("""
+    SELECT set_config('soft_delete_test.hostel_id', :hostel_id, true),
+           set_config('soft_delete_test.room_number', :room_number, true)
+""")
+
+SOFT_DELETE_TEST_BLOCK = """
+DO $$
+DECLARE
+    v_created record;
+    v_deleted record;
+    v_total bigint;
+    v_active bigint;
+    v_restored boolean;
+    v_hostel_id integer := current_setting('soft_delete_test.hostel_id')::integer;
+    v_room_number text := current_setting('soft_delete_test.room_number');
+BEGIN
+    INSERT INTO rooms (hostel_id, number, floor, room_type, capacity, is_deleted, deleted_at)
+    VALUES (v_hostel_id, v_room_number, 99, 'SINGLE', 1, FALSE, NULL)
+    RETURNING id, number, is_deleted, deleted_at INTO v_created;
+
+    UPDATE rooms SET is_deleted = TRUE, deleted_at = NOW()
+    WHERE id = v_created.id
+    RETURNING id, number, is_deleted, deleted_at INTO v_deleted;
+
+    SELECT COUNT(*), COUNT(*) FILTER (WHERE is_deleted = FALSE)
+    INTO v_total, v_active
+    FROM rooms WHERE hostel_id = v_hostel_id;
+
+    UPDATE rooms SET is_deleted = FALSE, deleted_at = NULL
+    WHERE id = v_created.id
+    RETURNING is_deleted INTO v_restored;
+
+    PERFORM set_config('soft_delete_test.result', json_build_object(
+        'created', row_to_json(v_created),
+        'deleted', row_to_json(v_deleted),
+        'total', v_total,
+        'active', v_active,
+        'restored_is_deleted', v_restored
+    )::text, true);
+END $$
+"""
+
+
+@asynccontextmanager
+async def soft_delete_round_trip(db, hostel_id: int, room_number: str):
+    """Create, soft delete, count and restore a test room; yield the summary.
+
+    Everything runs server-side in one DO block, which leaves a JSON summary
+    in a transaction-local setting. On exit the transaction is rolled back,
+    together with anything the caller wrote inside the block, rather than
+    cleaned up with DELETE, so nothing the test wrote survives.
+    """
+    try:
+        await db.execute(
+            SOFT_DELETE_TEST_PARAMS,
+            {"hostel_id": str(hostel_id), "room_number": room_number},
+        )
+        await db.execute(text(SOFT_DELETE_TEST_BLOCK))
+        result = await db.execute(
+            text("SELECT current_setting('soft_delete_test.result')")
+        )
+        yield json.loads(result.scalar())
+    finally:
+        await db.rollback()
+
+
+async def run_soft_delete_round_trip(db, hostel_id: int, room_number: str) -> dict:
+    """Run the round trip on its own, already rolled back; return the summary."""
+    async with soft_delete_round_trip(db, hostel_id, room_number) as summary:
+        return summary
+
+
+async def bulk_insert_test_rooms(db, hostel_id: int, prefix: str, count: int) -> None:
+    """Load count live test rooms numbered prefix-0..N with one COPY.
+
+    The caller owns the transaction and is expected to roll it back.
+    """
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        "rooms",
+        records=[
+            (hostel_id, f"{prefix}-{i}", 99, "SINGLE", 1, False, None)
+            for i in range(count)
+        ],
+        columns=[
+            "hostel_id", "number", "floor", "room_type", "capacity",
+            "is_deleted", "deleted_at",
+        ],
+    )
+
+
+async def _run_test(log) -> bool:
+    """Test soft delete end-to-end, reporting each line through log."""
+    log("\n🧪 TESTING SOFT DELETE FUNCTIONALITY\n")
+    log("=" * 60)
     
-    async with AsyncSessionLocal() as db:
+    async with ScriptSessionLocal() as db:
         try:
-            # Step 1: Create a test room
-            print("\n1️⃣ Creating test room...\n")
+            log("\n⚙️  Running create/delete/filter/restore on the server...")
+            summary = await run_soft_delete_round_trip(
+                db, TEST_HOSTEL_ID, TEST_ROOM_NUMBER
+            )
             
-            await db.execute(text("""
-                INSERT INTO rooms (hostel_id, number, floor, room_type, capacity, is_deleted, deleted_at)
-                VALUES (1, 'TEST_SOFT_DELETE', 99, 'SINGLE', 1, FALSE, NULL)
-            """))
-            await db.commit()
+            # Step 1: Create a test room
+            log("\n1️⃣ Creating test room...\n")
             
-            # Get the ID
-            result = await db.execute(text("""
-                SELECT id FROM rooms WHERE number = 'TEST_SOFT_DELETE'
-            """))
-            test_id = result.scalar()
-            print(f"   ✅ Created test room with ID: {test_id}")
+            row = summary["created"]
+            test_id = row["id"]
+            log(f"   ✅ Created test room with ID: {test_id}")
             
             # Step 2: Check it's visible (not deleted)
-            print("\n2️⃣ Checking room is visible...\n")
-            
-            result = await db.execute(text(f"""
-                SELECT id, number, is_deleted, deleted_at 
-                FROM rooms 
-                WHERE id = {test_id}
-            """))
-            row = result.fetchone()
-            
-            print(f"   Room ID: {row[0]}")
-            print(f"   Number: {row[1]}")
-            print(f"   is_deleted: {row[2]}")
-            print(f"   deleted_at: {row[3]}")
-            
-            if row[2] is False:
-                print(f"\n   ✅ Room is active (not deleted)")
+            log("\n2️⃣ Checking room is visible...\n")
+            
+            log(f"   Room ID: {row['id']}")
+            log(f"   Number: {row['number']}")
+            log(f"   is_deleted: {row['is_deleted']}")
+            log(f"   deleted_at: {row['deleted_at']}")
+            
+            if row["is_deleted"] is False:
+                log(f"\n   ✅ Room is active (not deleted)")
             else:
-                print(f"\n   ❌ Room is already marked as deleted!")
+                log(f"\n   ❌ Room is already marked as deleted!")
                 return False
             
             # Step 3: Soft delete the room
-            print("\n3️⃣ Performing soft delete...\n")
+            log("\n3️⃣ Performing soft delete...\n")
             
-            await db.execute(text(f"""
-                UPDATE rooms 
-                SET is_deleted = TRUE, deleted_at = NOW()
-                WHERE id = {test_id}
-            """))
-            await db.commit()
+            row = summary["deleted"]
             
-            print(f"   ✅ Soft delete executed")
+            log(f"   ✅ Soft delete executed")
             
             # Step 4: Check it's marked as deleted
-            print("\n4️⃣ Verifying soft delete...\n")
-            
-            result = await db.execute(text(f"""
-                SELECT id, number, is_deleted, deleted_at 
-                FROM rooms 
-                WHERE id = {test_id}
-            """))
-            row = result.fetchone()
-            
-            print(f"   Room ID: {row[0]}")
-            print(f"   Number: {row[1]}")
-            print(f"   is_deleted: {row[2]}")
-            print(f"   deleted_at: {row[3]}")
-            
-            if row[2] is True and row[3] is not None:
-                print(f"\n   ✅ SOFT DELETE IS WORKING!")
-                print(f"   ✅ Record is marked as deleted in PostgreSQL")
+            log("\n4️⃣ Verifying soft delete...\n")
+            
+            log(f"   Room ID: {row['id']}")
+            log(f"   Number: {row['number']}")
+            log(f"   is_deleted: {row['is_deleted']}")
+            log(f"   deleted_at: {row['deleted_at']}")
+            
+            if row["is_deleted"] is True and row["deleted_at"] is not None:
+                log(f"\n   ✅ SOFT DELETE IS WORKING!")
+                log(f"   ✅ Record is marked as deleted in PostgreSQL")
             else:
-                print(f"\n   ❌ SOFT DELETE NOT WORKING!")
-                print(f"   ❌ Record is NOT marked as deleted")
+                log(f"\n   ❌ SOFT DELETE NOT WORKING!")
+                log(f"   ❌ Record is NOT marked as deleted")
                 return False
             
             # Step 5: Test filtering (what API does)
-            print("\n5️⃣ Testing query filtering...\n")
+            log("\n5️⃣ Testing query filtering...\n")
             
-            # Count all rooms (including deleted)
-            result = await db.execute(text("""
-                SELECT COUNT(*) FROM rooms WHERE hostel_id = 1
-            """))
-            total = result.scalar()
+            total = summary["total"]
+            active = summary["active"]
             
-            # Count only active rooms (excluding deleted)
-            result = await db.execute(text("""
-                SELECT COUNT(*) FROM rooms 
-                WHERE hostel_id = 1 AND is_deleted = FALSE
-            """))
-            active = result.scalar()
-            
-            print(f"   Total rooms (including deleted): {total}")
-            print(f"   Active rooms (excluding deleted): {active}")
-            print(f"   Deleted rooms: {total - active}")
+            log(f"   Total rooms (including deleted): {total}")
+            log(f"   Active rooms (excluding deleted): {active}")
+            log(f"   Deleted rooms: {total - active}")
             
             if total > active:
-                print(f"\n   ✅ Filtering works correctly!")
+                log(f"\n   ✅ Filtering works correctly!")
             else:
-                print(f"\n   ⚠️  No deleted rooms found (unexpected)")
+                log(f"\n   ⚠️  No deleted rooms found (unexpected)")
             
             # Step 6: Test restore
-            print("\n6️⃣ Testing restore...\n")
-            
-            await db.execute(text(f"""
-                UPDATE rooms 
-                SET is_deleted = FALSE, deleted_at = NULL
-                WHERE id = {test_id}
-            """))
-            await db.commit()
-            
-            result = await db.execute(text(f"""
-                SELECT is_deleted FROM rooms WHERE id = {test_id}
-            """))
-            is_deleted = result.scalar()
-            
-            if is_deleted is False:
-                print(f"   ✅ Restore works!")
+            log("\n6️⃣ Testing restore...\n")
+            
+            if summary["restored_is_deleted"] is False:
+                log(f"   ✅ Restore works!")
             else:
-                print(f"   ❌ Restore failed!")
+                log(f"   ❌ Restore failed!")
                 return False
             
             # Clean up
-            print("\n7️⃣ Cleaning up test data...\n")
+            log("\n7️⃣ Cleaning up test data...\n")
             
-            await db.execute(text(f"""
-                DELETE FROM rooms WHERE id = {test_id}
-            """))
-            await db.commit()
-            
-            print(f"   ✅ Test data cleaned up")
+            log(f"   ✅ Test data cleaned up")
             
             # Final summary
-            print("\n" + "=" * 60)
-            print("✅ ALL TESTS PASSED!")
-            print("=" * 60)
-            print("\n🎉 Your soft delete is working correctly!\n")
-            print("What this means:")
-            print("  ✅ PostgreSQL has is_deleted and deleted_at columns")
-            print("  ✅ UPDATE queries successfully mark records as deleted")
-            print("  ✅ Filtering excludes deleted records")
-            print("  ✅ Restore functionality works")
-            print("\nNow test in Swagger:")
-            print("  1. DELETE /api/v1/rooms/{room_id}")
-            print("  2. GET /api/v1/rooms/{room_id} → should return 404")
-            print("  3. POST /api/v1/rooms/{room_id}/restore → should work")
-            print("=" * 60 + "\n")
+            log("\n" + "=" * 60)
+            log("✅ ALL TESTS PASSED!")
+            log("=" * 60)
+            log("\n🎉 Your soft delete is working correctly!\n")
+            log("What this means:")
+            log("  ✅ PostgreSQL has is_deleted and deleted_at columns")
+            log("  ✅ UPDATE queries successfully mark records as deleted")
+            log("  ✅ Filtering excludes deleted records")
+            log("  ✅ Restore functionality works")
+            log("\nNow test in Swagger:")
+            log("  1. DELETE /api/v1/rooms/{room_id}")
+            log("  2. GET /api/v1/rooms/{room_id} → should return 404")
+            log("  3. POST /api/v1/rooms/{room_id}/restore → should work")
+            log("=" * 60 + "\n")
             
             return True
             
         except Exception as e:
-            print(f"\n❌ TEST FAILED: {e}")
+            log(f"\n❌ TEST FAILED: {e}")
             await db.rollback()
-            import traceback
-            traceback.print_exc()
-            
-            print("\n" + "=" * 60)
-            print("TROUBLESHOOTING")
-            print("=" * 60)
-            print("\nIf you see 'column does not exist' error:")
-            print("  Run: python scripts/fix_soft_delete_simple.py")
-            print("\nIf you see 'table does not exist' error:")
-            print("  Run: python scripts/reset_db_simple.py")
-            print("  Then: python scripts/seed.py")
-            print("=" * 60 + "\n")
+            log(traceback.format_exc())
+            
+            log("\n" + "=" * 60)
+            log("TROUBLESHOOTING")
+            log("=" * 60)
+            log("\nIf you see 'column does not exist' error:")
+            log("  Run: python scripts/fix_soft_delete_simple.py")
+            log("\nIf you see 'table does not exist' error:")
+            log("  Run: python scripts/reset_db_simple.py")
+            log("  Then: python scripts/seed.py")
+            log("=" * 60 + "\n")
             
             return False
 
 
+async def test_soft_delete():
+    """Test soft delete end-to-end."""
+    # Buffer the report and write it once at the end, so no stdout write
+    # lands between the awaits
+    lines = []
+    try:
+        return await _run_test(lines.append)
+    finally:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+
 if __name__ == "__main__":
     success = asyncio.run(test_soft_delete())
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -2,143 +2,263 @@
 """Verify soft delete is working correctly."""
 
 import sys
+import json
 import asyncio
+import traceback
+import uuid
+from collections import defaultdict
 from pathlib import Path
 
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from sqlalchemy import text
-from app.database import AsyncSessionLocal
-from datetime import datetime
+from scripts._db import ScriptSessionLocal
+from scripts.test_soft_delete import bulk_insert_test_rooms, soft_delete_round_trip
 
+TEST_HOSTEL_ID = 1
+# Unique per run so concurrent runs never contend on the room number index
+TEST_ROOM_NUMBER = f"TEST_DELETE_{uuid.uuid4().hex[:8]}"
+# Rooms loaded for the bulk soft delete check
+BULK_TEST_ROOM_COUNT = 100
+# Table names allowed to be formatted into SQL. Every table-name f-string
+# iterates over this tuple, so there is nothing to check at runtime
+REPORT_TABLE_WHITELIST = ('rooms', 'beds', 'tenant_profiles')
+# Tables that must carry a "WHERE is_deleted = false" partial index
+ACTIVE_INDEXED_TABLES = REPORT_TABLE_WHITELIST
+# Below this many rows a sequential scan is the planner's right call, so the
+# plan check only gates larger tables
+PLAN_CHECK_MIN_ROWS = 10_000
+# Plan nodes that show the live-row filter is served by an index
+INDEX_SCAN_NODES = frozenset({'Index Scan', 'Index Only Scan', 'Bitmap Index Scan'})
 
-async def verify_soft_delete():
-    """Verify soft delete functionality."""
-    print("\n🔍 VERIFYING SOFT DELETE FUNCTIONALITY\n")
-    print("=" * 60)
+
+def _plan_nodes(node: dict):
+    """Yield an EXPLAIN (FORMAT JSON) plan node and all of its children."""
+    yield node
+    for child in node.get('Plans', []):
+        yield from _plan_nodes(child)
+
+
+async def _run_verification(log) -> bool:
+    """Verify soft delete functionality, reporting each line through log."""
+    log("\n🔍 VERIFYING SOFT DELETE FUNCTIONALITY\n")
+    log("=" * 60)
     
-    async with AsyncSessionLocal() as db:
+    async with ScriptSessionLocal() as db:
         try:
             # Step 1: Check columns exist
-            print("\n1️⃣ Checking if soft delete columns exist...\n")
+            log("\n1️⃣ Checking if soft delete columns exist...\n")
             
             tables = ['hostels', 'rooms', 'beds', 'tenant_profiles', 'users']
             all_good = True
             
+            # One catalog query for all tables, grouped in Python. Reads
+            # pg_attribute directly; the information_schema views add joins
+            # and per-row privilege checks
+            query = text("""
+                SELECT c.relname, a.attname
+                FROM pg_attribute a
+                JOIN pg_class c ON a.attrelid = c.oid
+                WHERE c.relname = ANY(:tables)
+                AND c.relnamespace = current_schema()::regnamespace
+                AND c.relkind = 'r'
+                AND a.attname IN ('is_deleted', 'deleted_at')
+                AND NOT a.attisdropped
+            """)
+            
+            result = await db.execute(query, {"tables": tables})
+            columns_by_table = defaultdict(set)
+            for table, column_name in result.fetchall():
+                columns_by_table[table].add(column_name)
+            
             for table in tables:
-                query = text(f"""
-                    SELECT column_name, data_type 
-                    FROM information_schema.columns 
-                    WHERE table_name = '{table}' 
-                    AND column_name IN ('is_deleted', 'deleted_at')
-                    ORDER BY column_name
-                """)
+                if columns_by_table[table] == {'is_deleted', 'deleted_at'}:
+                    log(f"   ✅ {table}: is_deleted (boolean), deleted_at (timestamp)")
+                else:
+                    log(f"   ❌ {table}: MISSING COLUMNS!")
+                    all_good = False
+            
+            if not all_good:
+                log("\n❌ Some tables are missing soft delete columns!")
+                log("Run: python scripts/fix_soft_delete_simple.py")
+                return False
+            
+            # Step 1b: Check the live-row partial indexes exist
+            log("\n   Checking partial indexes on live rows...\n")
+            
+            result = await db.execute(
+                text("""
+                    SELECT DISTINCT tablename
+                    FROM pg_indexes
+                    WHERE schemaname = current_schema()
+                    AND tablename = ANY(:tables)
+                    AND indexdef ILIKE '%WHERE%is_deleted = false%'
+                """),
+                {"tables": list(ACTIVE_INDEXED_TABLES)},
+            )
+            indexed = set(result.scalars().all())
+            
+            for table in ACTIVE_INDEXED_TABLES:
+                if table in indexed:
+                    log(f"   ✅ {table}: partial index WHERE is_deleted = false")
+                else:
+                    log(f"   ❌ {table}: MISSING PARTIAL INDEX!")
+                    all_good = False
+            
+            if not all_good:
+                log("\n❌ Some tables are missing the live-row partial index!")
+                log("Run: python scripts/fix_soft_delete_simple.py")
+                return False
+            
+            # Step 1c: Check the planner actually uses an index for the
+            # live-row filter on tables big enough for it to matter
+            log("\n   Checking live-row query plans...\n")
+            
+            result = await db.execute(
+                text("""
+                    SELECT c.relname, c.reltuples::bigint
+                    FROM pg_class c
+                    WHERE c.relname = ANY(:tables)
+                    AND c.relnamespace = current_schema()::regnamespace
+                """),
+                {"tables": list(ACTIVE_INDEXED_TABLES)},
+            )
+            estimates = dict(result.fetchall())
+            
+            for table in ACTIVE_INDEXED_TABLES:
+                rows = estimates.get(table, 0)
+                if rows < PLAN_CHECK_MIN_ROWS:
+                    log(f"   ⏭️  {table}: ~{max(rows, 0)} rows, plan check skipped")
+                    continue
                 
-                result = await db.execute(query)
-                columns = result.fetchall()
+                result = await db.execute(
+                    text(
+                        f"EXPLAIN (FORMAT JSON) SELECT id FROM {table} "
+                        f"WHERE hostel_id = :hostel_id AND is_deleted = FALSE"
+                    ),
+                    {"hostel_id": TEST_HOSTEL_ID},
+                )
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                node_types = {node.get('Node Type') for node in _plan_nodes(plan[0]['Plan'])}
                 
-                if len(columns) == 2:
-                    print(f"   ✅ {table}: is_deleted (boolean), deleted_at (timestamp)")
+                if node_types & INDEX_SCAN_NODES:
+                    log(f"   ✅ {table}: live-row filter uses an index")
                 else:
-                    print(f"   ❌ {table}: MISSING COLUMNS!")
+                    log(f"   ❌ {table}: live-row filter plans as {', '.join(sorted(node_types))}!")
                     all_good = False
             
             if not all_good:
-                print("\n❌ Some tables are missing soft delete columns!")
-                print("Run: python scripts/fix_soft_delete_simple.py")
+                log("\n❌ Live-row queries are not using the partial index!")
                 return False
             
             # Step 2: Test soft delete on a dummy room
-            print("\n2️⃣ Testing soft delete operation...\n")
-            
-            # Create test room
-            print("   Creating test room...")
-            await db.execute(text("""
-                INSERT INTO rooms (hostel_id, number, floor, room_type, capacity, is_deleted)
-                VALUES (1, 'TEST_DELETE', 99, 'SINGLE', 1, FALSE)
-            """))
-            await db.commit()
-            
-            # Get the room ID
-            result = await db.execute(text("""
-                SELECT id FROM rooms WHERE number = 'TEST_DELETE'
-            """))
-            test_room_id = result.scalar()
-            print(f"   ✅ Created test room ID: {test_room_id}")
-            
-            # Soft delete it
-            print("\n   Performing soft delete...")
-            await db.execute(text(f"""
-                UPDATE rooms 
-                SET is_deleted = TRUE, deleted_at = NOW()
-                WHERE id = {test_room_id}
-            """))
-            await db.commit()
-            
-            # Verify it's marked as deleted
-            result = await db.execute(text(f"""
-                SELECT is_deleted, deleted_at 
-                FROM rooms 
-                WHERE id = {test_room_id}
-            """))
-            row = result.fetchone()
-            
-            if row and row[0] is True and row[1] is not None:
-                print(f"   ✅ Soft delete successful!")
-                print(f"      is_deleted: {row[0]}")
-                print(f"      deleted_at: {row[1]}")
-            else:
-                print(f"   ❌ Soft delete FAILED!")
-                print(f"      is_deleted: {row[0] if row else 'N/A'}")
-                print(f"      deleted_at: {row[1] if row else 'N/A'}")
-                return False
+            log("\n2️⃣ Testing soft delete operation...\n")
             
-            # Clean up
-            await db.execute(text(f"""
-                DELETE FROM rooms WHERE id = {test_room_id}
-            """))
-            await db.commit()
-            print("\n   🧹 Cleaned up test data")
+            # Same server-side round trip as test_soft_delete.py. It and the
+            # bulk check below share one transaction, rolled back once when
+            # the block exits, so none of the test rooms become visible
+            log("   Creating and soft deleting a test room...")
+            async with soft_delete_round_trip(
+                db, TEST_HOSTEL_ID, TEST_ROOM_NUMBER
+            ) as summary:
+                log(f"   ✅ Created test room ID: {summary['created']['id']}")
+                row = summary["deleted"]
+                
+                if row["is_deleted"] is True and row["deleted_at"] is not None:
+                    log(f"   ✅ Soft delete successful!")
+                    log(f"      is_deleted: {row['is_deleted']}")
+                    log(f"      deleted_at: {row['deleted_at']}")
+                else:
+                    log(f"   ❌ Soft delete FAILED!")
+                    log(f"      is_deleted: {row['is_deleted']}")
+                    log(f"      deleted_at: {row['deleted_at']}")
+                    return False
+                
+                # Bulk soft delete: COPY a batch of rooms and soft delete them
+                # with one UPDATE
+                log(f"\n   Bulk soft deleting {BULK_TEST_ROOM_COUNT} test rooms...")
+                await bulk_insert_test_rooms(
+                    db, TEST_HOSTEL_ID, TEST_ROOM_NUMBER, BULK_TEST_ROOM_COUNT
+                )
+                result = await db.execute(
+                    text("""
+                        UPDATE rooms
+                        SET is_deleted = TRUE, deleted_at = NOW()
+                        WHERE hostel_id = :hostel_id
+                        AND number LIKE :prefix
+                        AND is_deleted = FALSE
+                    """),
+                    {"hostel_id": TEST_HOSTEL_ID, "prefix": f"{TEST_ROOM_NUMBER}-%"},
+                )
+                bulk_deleted = result.rowcount
+                
+                if bulk_deleted == BULK_TEST_ROOM_COUNT:
+                    log(f"   ✅ Bulk soft delete marked {bulk_deleted} rooms")
+                else:
+                    log(f"   ❌ Bulk soft delete marked {bulk_deleted} of {BULK_TEST_ROOM_COUNT} rooms!")
+                    return False
+            
+            log("\n   🧹 Cleaned up test data")
             
             # Step 3: Check current data
-            print("\n3️⃣ Checking existing records...\n")
-            
-            for table in ['rooms', 'beds', 'tenant_profiles']:
-                result = await db.execute(text(f"""
-                    SELECT 
-                        COUNT(*) as total,
-                        COUNT(*) FILTER (WHERE is_deleted = TRUE) as deleted,
-                        COUNT(*) FILTER (WHERE is_deleted = FALSE) as active
-                    FROM {table}
-                """))
-                row = result.fetchone()
-                
-                print(f"   {table}:")
-                print(f"      Total: {row[0]}, Active: {row[2]}, Deleted: {row[1]}")
-            
-            print("\n" + "=" * 60)
-            print("✅ VERIFICATION COMPLETE - ALL CHECKS PASSED!")
-            print("=" * 60)
-            print("\n📝 Your soft delete is working correctly!")
-            print("\nNow test in Swagger:")
-            print("1. DELETE /api/v1/rooms/{room_id}")
-            print("2. GET /api/v1/rooms/{room_id} → should return 404")
-            print("3. Check in PostgreSQL:")
-            print("   SELECT * FROM rooms WHERE id = {room_id};")
-            print("   → should show is_deleted = true")
-            print("=" * 60 + "\n")
+            log("\n3️⃣ Checking existing records...\n")
+            
+            # One UNION ALL query covering every table. Table names can't be
+            # bound, so only the whitelisted literals are spliced in
+            report_tables = REPORT_TABLE_WHITELIST
+            query = text("\nUNION ALL\n".join(
+                f"""
+                SELECT 
+                    '{table}' AS table_name,
+                    COUNT(*) as total,
+                    COUNT(*) FILTER (WHERE is_deleted = TRUE) as deleted,
+                    COUNT(*) FILTER (WHERE is_deleted = FALSE) as active
+                FROM {table}
+                """
+                for table in report_tables
+            ))
+            result = await db.execute(query)
+            
+            for row in result.mappings():
+                log(f"   {row['table_name']}:")
+                log(f"      Total: {row['total']}, Active: {row['active']}, Deleted: {row['deleted']}")
+            
+            log("\n" + "=" * 60)
+            log("✅ VERIFICATION COMPLETE - ALL CHECKS PASSED!")
+            log("=" * 60)
+            log("\n📝 Your soft delete is working correctly!")
+            log("\nNow test in Swagger:")
+            log("1. DELETE /api/v1/rooms/{room_id}")
+            log("2. GET /api/v1/rooms/{room_id} → should return 404")
+            log("3. Check in PostgreSQL:")
+            log("   SELECT * FROM rooms WHERE id = {room_id};")
+            log("   → should show is_deleted = true")
+            log("=" * 60 + "\n")
             
             return True
             
         except Exception as e:
-            print(f"\n❌ ERROR: {e}")
+            log(f"\n❌ ERROR: {e}")
             await db.rollback()
-            import traceback
-            traceback.print_exc()
+            log(traceback.format_exc())
             return False
 
 
+async def verify_soft_delete():
+    """Verify soft delete functionality."""
+    # Buffer the report and write it once at the end, so no stdout write
+    # lands between the awaits
+    lines = []
+    try:
+        return await _run_verification(lines.append)
+    finally:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+
 if __name__ == "__main__":
     success = asyncio.run(verify_soft_delete())
     sys.exit(0 if success else 1)
\ No newline at end of file